@@ -7,8 +7,11 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import NoSuchElementException
 from selenium.common.exceptions import TimeoutException
-from google.auth.exceptions import TransportError
+from google.auth.exceptions import TransportError, RefreshError
 from google.oauth2 import service_account
+from gspread.exceptions import APIError
+from gspread.http_client import HTTPClient
+from gspread.utils import numericise, rowcol_to_a1
 
 
 import os
@@ -19,6 +22,28 @@ import traceback
 import requests
 import json
 import backoff
+import asyncio
+import httpx
+import re
+import sqlite3
+import threading
+import random
+import multiprocessing
+import functools
+import inspect
+import gzip
+import copy
+import logging
+import logging.handlers
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
 
 # .env 파일 로드
 load_dotenv()
@@ -35,12 +60,479 @@ sheet_key = os.getenv("SHEET_KEY")
 store_api_key = os.getenv("STORE_API_KEY")
 store_basic_url = os.getenv("STORE_BASIC_URL")
 make_hook_url = os.getenv("MAKE_HOOK_URL")
+status_chunk_size = int(os.getenv("STATUS_CHUNK_SIZE", "100"))
+store_max_concurrency = int(os.getenv("STORE_MAX_CONCURRENCY", "10"))
+store_api_timeout = float(os.getenv("STORE_API_TIMEOUT", "30"))
+sheet_write_chunk_size = int(os.getenv("SHEET_WRITE_CHUNK_SIZE", "200"))
+state_dir = os.getenv("STATE_DIR", "state")
+sheet_data_ttl = int(os.getenv("SHEET_DATA_TTL", "60"))
+sheets_quota_per_minute = int(os.getenv("SHEETS_QUOTA_PER_MINUTE", "60"))
+sheets_max_retries = int(os.getenv("SHEETS_MAX_RETRIES", "5"))
+# 주문 시트를 로컬 스냅샷 + 새 행/배송중 행만 읽는 방식으로 조회
+sheet_incremental_read = os.getenv("SHEET_INCREMENTAL_READ", "false").lower() in ('1', 'true', 'yes')
+sheet_full_reload_seconds = int(os.getenv("SHEET_FULL_RELOAD_SECONDS", "21600"))
+# 주문 시트를 배송중 행만, 상태는 category 로 읽어 메모리 사용량을 줄인다
+sheet_lean_load = os.getenv("SHEET_LEAN_LOAD", "false").lower() in ('1', 'true', 'yes')
+status_cache_ttl = int(os.getenv("STATUS_CACHE_TTL", "300"))
+status_cache_max_entries = int(os.getenv("STATUS_CACHE_MAX_ENTRIES", "50000"))
+# 배송중 목록 크롤링 방식: single(첫 화면만) | paged(전체 페이지) | windowed(기간 분할 + 탭 병렬)
+scrape_mode = os.getenv("SCRAPE_MODE", "single")
+shipping_page_size = int(os.getenv("SHIPPING_PAGE_SIZE", "500"))
+shipping_page_size_param = os.getenv("SHIPPING_PAGE_SIZE_PARAM", "limit")
+shipping_page_param = os.getenv("SHIPPING_PAGE_PARAM", "page")
+shipping_start_date_param = os.getenv("SHIPPING_START_DATE_PARAM", "start_date")
+shipping_end_date_param = os.getenv("SHIPPING_END_DATE_PARAM", "end_date")
+scrape_lookback_days = int(os.getenv("SCRAPE_LOOKBACK_DAYS", "90"))
+scrape_window_days = int(os.getenv("SCRAPE_WINDOW_DAYS", "30"))
+scrape_max_tabs = int(os.getenv("SCRAPE_MAX_TABS", "4"))
+# 기간(또는 전체)별로 읽을 최대 페이지 수: 페이지 파라미터를 무시하는 화면에서도 순회가 끝나도록
+scrape_max_pages = int(os.getenv("SCRAPE_MAX_PAGES", "50"))
+driver_max_cycles = int(os.getenv("DRIVER_MAX_CYCLES", "20"))
+# chromedriver + Chrome 프로세스 전체 RSS 기준
+driver_max_memory_mb = int(os.getenv("DRIVER_MAX_MEMORY_MB", "1536"))
+# 브라우저 프로필: normal | lean(eager 로드 + 이미지/폰트/분석 스크립트 차단)
+browser_profile = os.getenv("BROWSER_PROFILE", "normal")
+lean_window_size = os.getenv("LEAN_WINDOW_SIZE", "1024,768")
+chrome_data_dir = os.getenv("CHROME_DATA_DIR", "/home/chrome/chrome-data")
+chrome_debugging_port = int(os.getenv("CHROME_DEBUGGING_PORT", "9222"))
+# 여러 몰 동시 실행: 몰 설정 목록 JSON 파일과 프로세스 수
+malls_config = os.getenv("MALLS_CONFIG")
+mall_workers = int(os.getenv("MALL_WORKERS", "2"))
+# 사이클 지표 파일 위치와 느린 사이클 기준 (초)
+metrics_dir = os.getenv("METRICS_DIR", "logs")
+slow_cycle_seconds = int(os.getenv("SLOW_CYCLE_SECONDS", "600"))
+# 설정하면 사이클마다 크롤링 결과, 시트 스냅샷, 스토어 응답을 replay.py 용 캡처 파일로 저장
+cycle_record_dir = os.getenv("CYCLE_RECORD_DIR", "")
+# 주문/수동주문 시트를 로컬 SQLite 사본(state_dir/order_store.sqlite3)에서 읽고 쓰고, 변경은 백그라운드로 시트에 반영
+order_store_enabled = os.getenv("ORDER_STORE", "false").lower() in ('1', 'true', 'yes')
+order_store_sync_seconds = int(os.getenv("ORDER_STORE_SYNC_SECONDS", "60"))
+order_store_pull_seconds = int(os.getenv("ORDER_STORE_PULL_SECONDS", "300"))
+# 실패한 사이클의 체크포인트를 이어받을 수 있는 시간 (초)
+cycle_journal_ttl = int(os.getenv("CYCLE_JOURNAL_TTL", "900"))
+# 실패한 몰 사이클을 체크포인트에서 이어서 재시도하는 횟수(첫 시도 포함)와 간격 (초)
+mall_max_attempts = int(os.getenv("MALL_MAX_ATTEMPTS", "3"))
+mall_retry_delay = int(os.getenv("MALL_RETRY_DELAY", "60"))
+# 주문별 로그: detail(주문마다 한 줄) | summary(사이클 요약만)
+order_log = os.getenv("ORDER_LOG", "detail")
+
+LOGGER_NAME = 'market_automation_check'
+logger = logging.getLogger(LOGGER_NAME)
+# 주문 단위 로그는 하위 로거로 분리해 레벨만으로 끌 수 있게 한다
+order_logger = logging.getLogger(f"{LOGGER_NAME}.orders")
+if order_log == 'summary':
+    order_logger.setLevel(logging.WARNING)
+
+# 주문 한 건의 로그: 로거가 꺼져 있으면 메시지와 extra 를 만들지 않는다
+def log_order(message, market_order_num=None, store_order_num=None, status=None, level=logging.INFO):
+    if not order_logger.isEnabledFor(level):
+        return
+    order_logger.log(level, '%s %s - %s %s', message, store_order_num or '', market_order_num or '', status or '', extra={
+        'market_order_num': None if market_order_num is None else str(market_order_num),
+        'store_order_num': None if store_order_num is None else str(store_order_num),
+        'status': status,
+    })
+
+class MallLogFilter(logging.Filter):
+    """로그 레코드에 현재 처리 중인 몰 이름을 붙인다"""
+
+    mall = None
+
+    def filter(self, record):
+        if getattr(record, 'mall', None) is None:
+            record.mall = self.mall
+        return True
+
+
+mall_log_filter = MallLogFilter()
+
+# 프로세스 풀 작업자의 로그를 부모 프로세스의 큐로 보낸다 (파일/콘솔 출력은 부모의 QueueListener 가 담당)
+def init_worker_logging(log_queue):
+    if log_queue is None:
+        return
+    handler = logging.handlers.QueueHandler(log_queue)
+    handler.addFilter(mall_log_filter)
+    logger.handlers.clear()
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+@dataclass
+class MallConfig:
+    """몰 하나를 처리하는 데 필요한 접속 정보와 로컬 상태 위치"""
+
+    name: str = 'default'
+    username: str = None
+    password: str = None
+    login_page: str = None
+    dashboard_page: str = None
+    shipping_page: str = None
+    json_str: str = None
+    sheet_key: str = None
+    store_api_key: str = None
+    store_basic_url: str = None
+    make_hook_url: str = None
+    state_dir: str = 'state'
+    chrome_data_dir: str = '/home/chrome/chrome-data'
+    debugging_port: int = 9222
+
+    # .env 의 단일 몰 설정
+    @classmethod
+    def from_env(cls):
+        return cls(
+            username=username,
+            password=password,
+            login_page=login_page,
+            dashboard_page=dashboard_page,
+            shipping_page=shipping_page,
+            json_str=json_str,
+            sheet_key=sheet_key,
+            store_api_key=store_api_key,
+            store_basic_url=store_basic_url,
+            make_hook_url=make_hook_url,
+            state_dir=state_dir,
+            chrome_data_dir=chrome_data_dir,
+            debugging_port=chrome_debugging_port,
+        )
+
+    # 몰 설정 목록의 항목, 빠진 값은 .env 값을 쓰고 상태/브라우저 경로는 몰마다 분리
+    @classmethod
+    def from_dict(cls, data, index=0):
+        base = cls.from_env()
+        name = data['name']
+        values = {
+            **asdict(base),
+            'state_dir': os.path.join(state_dir, name),
+            'chrome_data_dir': f"{chrome_data_dir}-{name}",
+            'debugging_port': chrome_debugging_port + index + 1,
+            **data,
+        }
+        return cls(**values)
 
 
-class GoogleSheetManager:
+def load_mall_configs(path=None):
+    with open(path or malls_config, encoding='utf-8') as f:
+        return [MallConfig.from_dict(item, idx) for idx, item in enumerate(json.load(f))]
+
+
+class CycleMetrics:
+    """사이클 단위 단계별 소요 시간과 카운터"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.started = time.time()
+            self.stage_seconds = {}
+            self.stage_calls = {}
+            self.counters = {}
+            self.order_statuses = {}
+
+    def add_time(self, stage, seconds):
+        with self.lock:
+            self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+            self.stage_calls[stage] = self.stage_calls.get(stage, 0) + 1
+
+    def incr(self, name, value=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def count_status(self, status):
+        status = status or 'Unknown'
+        with self.lock:
+            self.order_statuses[status] = self.order_statuses.get(status, 0) + 1
+
+    @contextmanager
+    def timer(self, stage):
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.monotonic() - started)
+
+    # 함수(동기/비동기) 실행 시간을 stage 이름으로 기록하는 데코레이터
+    def timed(self, stage):
+        def decorator(func):
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.timer(stage):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(stage):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def snapshot(self, mall, total_seconds):
+        with self.lock:
+            return {
+                'mall': mall,
+                'started_at': self.started,
+                'total_seconds': round(total_seconds, 3),
+                'stage_seconds': {stage: round(seconds, 3) for stage, seconds in self.stage_seconds.items()},
+                'stage_calls': dict(self.stage_calls),
+                'counters': dict(self.counters),
+                'order_statuses': dict(self.order_statuses),
+            }
+
+    # 알림용 짧은 요약: 오래 걸린 단계 순
+    def summary(self, total_seconds, top=6):
+        with self.lock:
+            stages = sorted(self.stage_seconds.items(), key=lambda item: item[1], reverse=True)[:top]
+        lines = [f"총 {total_seconds:.1f}초"]
+        lines += [f"- {stage}: {seconds:.1f}초 ({self.stage_calls.get(stage, 0)}회)" for stage, seconds in stages]
+        return '\n'.join(lines)
+
+    # JSON 한 줄(metrics.jsonl)과 Prometheus textfile 로 기록
+    def write(self, mall, total_seconds, directory=None):
+        directory = directory or metrics_dir
+        data = self.snapshot(mall, total_seconds)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with open(os.path.join(directory, 'metrics.jsonl'), 'a', encoding='utf-8') as f:
+                f.write(json.dumps(data, ensure_ascii=False) + '\n')
+
+            # 매 사이클 값으로 덮어쓰는 파일이므로 모두 gauge (누적 counter 가 아님)
+            label = f'mall="{mall}"'
+            families = [
+                ('automation_cycle_seconds', '마지막 사이클 전체 소요 시간',
+                 [(label, data['total_seconds'])]),
+                ('automation_cycle_timestamp_seconds', '마지막 사이클 시작 시각 (unix time)',
+                 [(label, f"{data['started_at']:.0f}")]),
+                ('automation_stage_seconds', '마지막 사이클의 단계별 소요 시간',
+                 [(f'{label},stage="{stage}"', seconds) for stage, seconds in data['stage_seconds'].items()]),
+                ('automation_stage_calls', '마지막 사이클의 단계별 호출 수',
+                 [(f'{label},stage="{stage}"', calls) for stage, calls in data['stage_calls'].items()]),
+                ('automation_events', '마지막 사이클의 이벤트 수',
+                 [(f'{label},name="{name}"', value) for name, value in data['counters'].items()]),
+                ('automation_orders', '마지막 사이클의 주문 상태별 수',
+                 [(f'{label},status="{status}"', count) for status, count in data['order_statuses'].items()]),
+            ]
+            lines = []
+            for name, help_text, samples in families:
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge']
+                lines += [f'{name}{{{labels}}} {value}' for labels, value in samples]
+            path = os.path.join(directory, f'automation_check_{mall}.prom')
+            with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
+            os.replace(f"{path}.tmp", path)
+        except Exception as e:
+            logger.warning(f"사이클 지표 기록 실패: {e}")
+        return data
+
+
+metrics = CycleMetrics()
+
+
+class CycleRecorder:
+    """한 사이클의 입력(크롤링 주문, 시트 스냅샷, 스토어 응답)을 모아 gzip JSON 캡처로 저장"""
+
     def __init__(self):
+        self.lock = threading.Lock()
+        self.reset(None)
+
+    # directory 가 None 이면 이번 사이클은 기록하지 않는다
+    def reset(self, directory):
+        with self.lock:
+            self.directory = directory
+            self.data = {'store_responses': [], 'status_map': {}}
+
+    @property
+    def enabled(self):
+        return bool(self.directory)
+
+    # 이후 단계가 값을 바꿔도 기록된 시점의 모습을 유지하도록 복사
+    def record(self, name, value):
+        if not self.enabled:
+            return
+        value = copy.deepcopy(value)
+        with self.lock:
+            self.data[name] = value
+
+    def record_frame(self, name, df):
+        if not self.enabled:
+            return
+        self.record(name, {'columns': list(df.columns), 'rows': df.astype(object).values.tolist()})
+
+    def record_store_response(self, params, response):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.data['store_responses'].append({'params': dict(params), 'response': response})
+
+    def record_status_map(self, status_map):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.data['status_map'].update(status_map)
+
+    def save(self, mall, stats):
+        if not self.enabled:
+            return None
+        path = os.path.join(self.directory, f"cycle_{mall}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json.gz")
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with self.lock:
+                data = {'mall': mall, 'recorded_at': time.time(), 'stats': dict(stats), **self.data}
+            with gzip.open(path, 'wt', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, default=str)
+            logger.info(f"사이클 캡처 저장: {path}")
+            return path
+        except Exception as e:
+            logger.warning(f"사이클 캡처 저장 실패: {e}")
+            return None
+
+def load_cycle_capture(path):
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return json.load(f)
+
+
+recorder = CycleRecorder()
+
+
+class SheetsRateLimiter:
+    """모든 구글 시트 요청이 공유하는 분당 할당량 토큰 버킷"""
+
+    def __init__(self, per_minute=None):
+        per_minute = per_minute or sheets_quota_per_minute
+        self.rate = per_minute / 60.0
+        self.capacity = max(per_minute / 6.0, 1.0)  # 10초 분량까지만 몰아서 사용
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.requests = 0
+        self.rate_limited = 0
+        self.throttled_seconds = 0.0
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    self.requests += 1
+                    return
+                wait = max(self.blocked_until - now, (1 - self.tokens) / self.rate, 0.01)
+                self.throttled_seconds += wait
+            time.sleep(wait)
+
+    # 429 응답을 받으면 모든 요청을 Retry-After 동안 멈춘다
+    def block_for(self, seconds):
+        with self.lock:
+            self.rate_limited += 1
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = 0
+
+    def stats(self):
+        return {
+            'requests': self.requests,
+            'rate_limited': self.rate_limited,
+            'throttled_seconds': round(self.throttled_seconds, 2),
+        }
+
+
+sheets_rate_limiter = SheetsRateLimiter()
+
+# Retry-After 헤더(초 또는 HTTP 날짜)를 해석, 없으면 지수 대기
+def retry_after_seconds(response, attempt):
+    value = response.headers.get('Retry-After') if response is not None else None
+    if value:
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            try:
+                return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+            except Exception:
+                pass
+    return min(2 ** attempt, 64)
+
+
+class RateLimitedHTTPClient(HTTPClient):
+    """gspread 의 모든 요청을 sheets_rate_limiter 를 거쳐 보내고 429 는 대기 후 재시도"""
+
+    def request(self, *args, **kwargs):
+        method = (args[0] if args else kwargs.get('method', '')).upper()
+        for attempt in range(sheets_max_retries + 1):
+            sheets_rate_limiter.acquire()
+            metrics.incr('sheet_reads' if method == 'GET' else 'sheet_writes')
+            try:
+                return super().request(*args, **kwargs)
+            except APIError as e:
+                if e.response.status_code != 429 or attempt == sheets_max_retries:
+                    raise
+                wait = retry_after_seconds(e.response, attempt) + random.uniform(0, 1)
+                logger.warning(f"구글 시트 할당량 초과, {wait:.1f}초 후 재시도 ({attempt + 1}/{sheets_max_retries})")
+                metrics.incr('sheet_retries')
+                sheets_rate_limiter.block_for(wait)
+
+
+# 재연결이 필요한 인증/전송 오류인지 판단
+def is_connection_error(e):
+    if isinstance(e, (TransportError, RefreshError, requests.exceptions.ConnectionError)):
+        return True
+    return isinstance(e, APIError) and e.response is not None and e.response.status_code == 401
+
+
+# 값 종류가 적어 category 로 저장하는 컬럼
+CATEGORICAL_COLUMNS = ('주문상태', '처리상태')
+
+# get_all_values 결과로 필요한 컬럼만, 필요하면 배송중 행만 담은 DataFrame 생성
+def build_sheet_frame(values, columns=None, only_shipping=False):
+    header = values[0] if values else []
+    columns = list(columns or header)
+    col_idx = [header.index(col) for col in columns]
+    rows = values[1:]
+    if only_shipping:
+        status_idx = header.index('주문상태')
+        rows = [row for row in rows if len(row) > status_idx and row[status_idx] == '배송중']
+
+    # 행 dict 를 만들지 않고 컬럼 단위로 바로 채운다
+    data = {col: [row[idx] if idx < len(row) else '' for row in rows] for col, idx in zip(columns, col_idx)}
+    df = pd.DataFrame(data, columns=columns)
+    for col in CATEGORICAL_COLUMNS:
+        if col in df:
+            df[col] = df[col].astype('category')
+    return df
+
+# 행 길이를 헤더 길이에 맞춤 (범위 조회는 뒤쪽 빈 셀을 생략)
+def pad_row(row, width):
+    return list(row[:width]) + [''] * (width - len(row))
+
+# 정렬된 행 번호를 연속 구간 [(시작, 끝)] 으로 묶는다
+def group_consecutive(row_nums):
+    groups = []
+    for row_num in row_nums:
+        if groups and groups[-1][1] == row_num - 1:
+            groups[-1][1] = row_num
+        else:
+            groups.append([row_num, row_num])
+    return [tuple(group) for group in groups]
+
+
+class GoogleSheetManager:
+    """프로세스 전체에서 재사용하는 구글 시트 연결 (자격증명, 워크시트 핸들, 시트 데이터 캐시)"""
+
+    def __init__(self, config=None, data_ttl=None):
+        self.config = config or MallConfig.from_env()
+        self.credentials = None
         self.gc = None
         self.doc = None
+        self.worksheets = {}
+        self.data_cache = {}  # 시트 이름 -> (조회 시각, DataFrame)
+        self.data_ttl = data_ttl if data_ttl is not None else sheet_data_ttl
+        self.lock = threading.RLock()
         self.initialize_connection()
 
     @backoff.on_exception(
@@ -50,36 +542,58 @@ class GoogleSheetManager:
     )
     def initialize_connection(self):
         try:
-            credentials_info = json.loads(json_str)
-            if 'private_key' in credentials_info:
-                pk = credentials_info['private_key']
-                pk = pk.replace('\\n', '\n')
-                credentials_info['private_key'] = pk
-            print("JSON 파싱 성공")
-            credentials = service_account.Credentials.from_service_account_info(
-                credentials_info,
-                scopes=['https://www.googleapis.com/auth/spreadsheets']
-            )
-            self.gc = gspread.authorize(credentials)
-            self.doc = self.gc.open_by_key(sheet_key)
+            # 자격증명은 한 번만 만들고, 토큰 만료 시 gspread 세션이 자동 갱신
+            if self.credentials is None:
+                credentials_info = json.loads(self.config.json_str)
+                if 'private_key' in credentials_info:
+                    pk = credentials_info['private_key']
+                    pk = pk.replace('\\n', '\n')
+                    credentials_info['private_key'] = pk
+                logger.info("JSON 파싱 성공")
+                self.credentials = service_account.Credentials.from_service_account_info(
+                    credentials_info,
+                    scopes=['https://www.googleapis.com/auth/spreadsheets']
+                )
+            self.gc = gspread.authorize(self.credentials, http_client=RateLimitedHTTPClient)
+            self.doc = self.gc.open_by_key(self.config.sheet_key)
+            self.worksheets = {}
         except Exception as e:
-            print(f"연결 초기화 실패: {e}")
+            logger.warning(f"연결 초기화 실패: {e}")
             raise
 
     def get_worksheet(self, sheet_name):
-        try:
-            return self.doc.worksheet(sheet_name)
-        except Exception as e:
-            print(f"get_worksheet 실패: {e}")
-            self.initialize_connection()  # 연결 재시도
-            return self.doc.worksheet(sheet_name)
-
+        with self.lock:
+            if sheet_name in self.worksheets:
+                return self.worksheets[sheet_name]
+            try:
+                worksheet = self.doc.worksheet(sheet_name)
+            except Exception as e:
+                if not is_connection_error(e):
+                    raise
+                logger.warning(f"get_worksheet 실패: {e}")
+                self.initialize_connection()  # 연결 재시도
+                worksheet = self.doc.worksheet(sheet_name)
+            self.worksheets[sheet_name] = worksheet
+            return worksheet
+
+    # 캐시된 워크시트의 행 수(row_count)는 열 때의 값이므로 다시 열어 현재 그리드 크기를 받는다
+    def refresh_worksheet(self, sheet_name):
+        with self.lock:
+            self.worksheets.pop(sheet_name, None)
+        return self.get_worksheet(sheet_name)
+
+    @metrics.timed('get_sheet_data')
     @backoff.on_exception(
         backoff.expo,
         (TransportError, requests.exceptions.RequestException),
         max_tries=5
     )
     def get_sheet_data(self, sheet_name):
+        with self.lock:
+            cached = self.data_cache.get(sheet_name)
+            if cached and time.monotonic() - cached[0] < self.data_ttl:
+                return cached[1]
+
         worksheet = self.get_worksheet(sheet_name)
         try:
             header = worksheet.row_values(1)
@@ -89,12 +603,183 @@ class GoogleSheetManager:
                 df = pd.DataFrame(columns=header)
             else:
                 df = pd.DataFrame(data)
-            
+
+            with self.lock:
+                self.data_cache[sheet_name] = (time.monotonic(), df)
             return df
         except Exception as e:
-            print(f"시트 데이터 가져오기 실패: {e}")
+            logger.warning(f"시트 데이터 가져오기 실패: {e}")
+            if is_connection_error(e):
+                self.reconnect()
+            raise
+
+    @metrics.timed('get_sheet_data')
+    @backoff.on_exception(
+        backoff.expo,
+        (TransportError, requests.exceptions.RequestException),
+        max_tries=5
+    )
+    def get_sheet_frame(self, sheet_name, columns=None, only_shipping=False):
+        """get_all_values 한 번으로 필요한 컬럼/행만 담은 타입 지정 DataFrame 조회"""
+        cache_key = (sheet_name, tuple(columns or ()), only_shipping)
+        with self.lock:
+            cached = self.data_cache.get(cache_key)
+            if cached and time.monotonic() - cached[0] < self.data_ttl:
+                return cached[1]
+
+        try:
+            values = self.get_worksheet(sheet_name).get_all_values()
+        except Exception as e:
+            logger.warning(f"시트 데이터 가져오기 실패: {e}")
+            if is_connection_error(e):
+                self.reconnect()
             raise
 
+        df = build_sheet_frame(values, columns, only_shipping)
+        with self.lock:
+            self.data_cache[cache_key] = (time.monotonic(), df)
+        return df
+
+    def snapshot_path(self, sheet_name):
+        return os.path.join(self.config.state_dir, f'sheet_snapshot_{sheet_name}.json')
+
+    def load_snapshot(self, sheet_name):
+        path = self.snapshot_path(sheet_name)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"{sheet_name} 스냅샷 로드 실패: {e}")
+            return None
+
+    def save_snapshot(self, sheet_name, snapshot):
+        os.makedirs(self.config.state_dir, exist_ok=True)
+        path = self.snapshot_path(sheet_name)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def cache_rows(self, sheet_name, header, rows):
+        df = build_sheet_frame([header] + rows)
+        with self.lock:
+            self.data_cache[sheet_name] = (time.monotonic(), df)
+        return df
+
+    # 시트 전체를 한 번에 읽어 스냅샷을 새로 만든다
+    def reload_snapshot(self, sheet_name):
+        values = self.get_worksheet(sheet_name).get_all_values()
+        header = values[0] if values else []
+        rows = [pad_row(row, len(header)) for row in values[1:]]
+        self.save_snapshot(sheet_name, {'header': header, 'rows': rows, 'full_loaded_at': time.time()})
+        logger.info(f"{sheet_name} 전체 조회 {len(rows)}행")
+        return self.cache_rows(sheet_name, header, rows)
+
+    @metrics.timed('get_sheet_data')
+    @backoff.on_exception(
+        backoff.expo,
+        (TransportError, requests.exceptions.RequestException),
+        max_tries=5
+    )
+    def get_sheet_data_incremental(self, sheet_name):
+        """스냅샷 이후 추가된 행과 배송중 행만 범위 조회, 스냅샷이 어긋나면 전체 조회"""
+        with self.lock:
+            cached = self.data_cache.get(sheet_name)
+            if cached and time.monotonic() - cached[0] < self.data_ttl:
+                return cached[1]
+
+        snapshot = self.load_snapshot(sheet_name)
+        if (snapshot is None or not snapshot['header'] or
+                time.time() - snapshot.get('full_loaded_at', 0) > sheet_full_reload_seconds):
+            return self.reload_snapshot(sheet_name)
+
+        header, rows = snapshot['header'], snapshot['rows']
+        width = len(header)
+        last_col = re.sub(r'\d+', '', rowcol_to_a1(1, width))
+        key_idx = [header.index(col) for col in ('마켓주문번호', '스토어주문번호') if col in header]
+        status_idx = header.index('주문상태')
+
+        # 다시 읽을 행: 배송중 행과 마지막 행(행 삽입/삭제 감지용), 시트 행 번호 = 인덱스 + 2
+        watch_rows = sorted({idx + 2 for idx, row in enumerate(rows) if row[status_idx] == '배송중'} |
+                            ({len(rows) + 1} if rows else set()))
+        watermark = len(rows) + 1
+
+        # 그리드 밖 범위는 400(exceeds grid limits) 이므로 현재 행 수 안에서만 조회
+        worksheet = self.refresh_worksheet(sheet_name)
+        row_count = worksheet.row_count
+        if watermark > row_count:
+            logger.warning(f"{sheet_name} 행 수가 스냅샷보다 적음 ({row_count} < {watermark}), 전체 조회")
+            return self.reload_snapshot(sheet_name)
+        ranges = [f"A1:{last_col}1"]
+        ranges += [f"A{watermark + 1}:{last_col}{row_count}"] if watermark < row_count else []
+        ranges += [f"A{start}:{last_col}{end}" for start, end in group_consecutive(watch_rows)]
+
+        results = []
+        try:
+            for start in range(0, len(ranges), 100):
+                results.extend(worksheet.batch_get(ranges[start:start + 100]))
+        except APIError as e:
+            logger.warning(f"{sheet_name} 범위 조회 실패, 전체 조회: {e}")
+            return self.reload_snapshot(sheet_name)
+        if watermark >= row_count:
+            results.insert(1, [])
+
+        fresh_header = results[0][0] if results[0] else []
+        if fresh_header != header:
+            logger.warning(f"{sheet_name} 헤더 변경 감지, 전체 조회")
+            return self.reload_snapshot(sheet_name)
+
+        refreshed = {}
+        for (start, end), values in zip(group_consecutive(watch_rows), results[2:]):
+            for offset, row_num in enumerate(range(start, end + 1)):
+                refreshed[row_num] = pad_row(values[offset] if offset < len(values) else [], width)
+
+        # 주문번호가 바뀐 행이 있으면 행이 삽입/삭제/정렬된 것이므로 스냅샷을 버린다
+        for row_num, row in refreshed.items():
+            old_row = rows[row_num - 2]
+            if any(row[idx] != old_row[idx] for idx in key_idx):
+                logger.warning(f"{sheet_name} {row_num}행 변경 감지, 전체 조회")
+                return self.reload_snapshot(sheet_name)
+
+        for row_num, row in refreshed.items():
+            rows[row_num - 2] = row
+        new_rows = [pad_row(row, width) for row in results[1]]
+        rows.extend(new_rows)
+
+        snapshot['rows'] = rows
+        self.save_snapshot(sheet_name, snapshot)
+        logger.info(f"{sheet_name} 증분 조회: 새 행 {len(new_rows)}개, 재조회 {len(refreshed)}행")
+        return self.cache_rows(sheet_name, header, rows)
+
+    # 시트에 기록한 뒤에는 캐시된 데이터를 버린다
+    def invalidate(self, sheet_name=None):
+        with self.lock:
+            if sheet_name is None:
+                self.data_cache.clear()
+                return
+            for key in list(self.data_cache):
+                if key == sheet_name or (isinstance(key, tuple) and key[0] == sheet_name):
+                    del self.data_cache[key]
+
+    def reconnect(self):
+        with self.lock:
+            self.invalidate()
+            self.initialize_connection()
+
+
+_sheet_managers = {}
+_sheet_manager_lock = threading.Lock()
+
+# 프로세스 전체에서 몰마다 하나의 GoogleSheetManager 를 공유
+def get_sheet_manager(config=None):
+    config = config or MallConfig.from_env()
+    with _sheet_manager_lock:
+        if config.name not in _sheet_managers:
+            _sheet_managers[config.name] = GoogleSheetManager(config)
+        return _sheet_managers[config.name]
+
 # sheet_manager = GoogleSheetManager()
 # service_worksheets = sheet_manager.get_worksheet('market_service_list')
 # order_worksheets = sheet_manager.get_worksheet('market_store_order_list')
@@ -105,10 +790,116 @@ class GoogleSheetManager:
 # manual_order_sheet_data = sheet_manager.get_sheet_data('manual_order_list')
 
 
+# 더 이상 바뀌지 않는 스토어 주문 상태
+TERMINAL_STATUSES = ('Completed', 'Canceled', 'Partial')
+
+
+class StatusCache:
+    """스토어 주문 상태를 SQLite 에 캐시 (종료 상태는 영구, 진행 중 상태는 TTL)"""
+
+    def __init__(self, path=None, ttl=None, max_entries=None):
+        self.path = path or os.path.join(state_dir, 'status_cache.sqlite3')
+        self.ttl = ttl if ttl is not None else status_cache_ttl
+        self.max_entries = max_entries or status_cache_max_entries
+        self.conn = None
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def connect(self):
+        if self.conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self.conn = sqlite3.connect(self.path, check_same_thread=False)
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS order_status ("
+                "order_id TEXT PRIMARY KEY, response TEXT NOT NULL, terminal INTEGER NOT NULL, "
+                "updated_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_order_status_accessed ON order_status (accessed_at)")
+        return self.conn
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    # 캐시에 있는 주문 상태 반환 {주문번호: 응답}
+    def get_many(self, order_ids):
+        now = time.time()
+        found = {}
+        with self.lock:
+            conn = self.connect()
+            for start in range(0, len(order_ids), 500):
+                chunk = order_ids[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT order_id, response, terminal, updated_at FROM order_status "
+                    f"WHERE order_id IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                for order_id, response, terminal, updated_at in rows:
+                    if terminal or now - updated_at < self.ttl:
+                        found[order_id] = json.loads(response)
+            if found:
+                conn.executemany(
+                    "UPDATE order_status SET accessed_at = ? WHERE order_id = ?",
+                    [(now, order_id) for order_id in found]
+                )
+                conn.commit()
+        self.hits += len(found)
+        self.misses += len(order_ids) - len(found)
+        return found
+
+    def put_many(self, status_map):
+        if not status_map:
+            return
+        now = time.time()
+        with self.lock:
+            conn = self.connect()
+            conn.executemany(
+                "INSERT OR REPLACE INTO order_status (order_id, response, terminal, updated_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (order_id, json.dumps(response), int(response.get('status') in TERMINAL_STATUSES), now, now)
+                    for order_id, response in status_map.items()
+                ]
+            )
+            # 최대 개수를 넘으면 가장 오래 사용하지 않은 항목부터 삭제
+            count = conn.execute("SELECT COUNT(*) FROM order_status").fetchone()[0]
+            if count > self.max_entries:
+                conn.execute(
+                    "DELETE FROM order_status WHERE order_id IN "
+                    "(SELECT order_id FROM order_status ORDER BY accessed_at LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+            conn.commit()
+
+    def close(self):
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+
+_status_caches = {}
+
+# 몰마다 상태 디렉터리에 하나의 StatusCache
+def get_status_cache(config=None):
+    config = config or MallConfig.from_env()
+    if config.name not in _status_caches:
+        _status_caches[config.name] = StatusCache(os.path.join(config.state_dir, 'status_cache.sqlite3'))
+    return _status_caches[config.name]
+
+
 class StoreAPI:
-    def __init__(self, api_key):
+    def __init__(self, api_key, cache=None, base_url=None):
         self.api_key = api_key
-        self.base_url = store_basic_url
+        self.base_url = base_url or store_basic_url
+        self.session = requests.Session()  # keep-alive 연결 재사용
+        self.cache = cache
+
+    def _send(self, params):
+        metrics.incr('store_api_calls')
+        with metrics.timer(f"store_api.{params['action']}"):
+            return self.session.post(self.base_url, data=params)
 
     def create_order(self, service_id, link, quantity, runs=None, interval=None):
 
@@ -121,11 +912,11 @@ class StoreAPI:
         }
 
         try:
-            response = requests.post(self.base_url, data=params)
+            response = self._send(params)
             response.raise_for_status()  # HTTP 오류 체크
             return response.json()
         except requests.exceptions.RequestException as e:
-            print(f"주문 생성 중 오류 발생: {e}")
+            logger.warning(f"주문 생성 중 오류 발생: {e}")
             raise
     
     # 주문 상태 확인
@@ -138,11 +929,11 @@ class StoreAPI:
         }
 
         try:
-            response = requests.post(self.base_url, data=params)
+            response = self._send(params)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
-            print(f"주문 상태 확인 중 오류 발생: {e}")
+            logger.warning(f"주문 상태 확인 중 오류 발생: {e}")
             raise
 
     # 여러 주문의 상태를 한 번에 확인
@@ -155,13 +946,41 @@ class StoreAPI:
         }
 
         try:
-            response = requests.post(self.base_url, data=params)
+            response = self._send(params)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
-            print(f"다중 주문 상태 확인 중 오류 발생: {e}")
+            logger.warning(f"다중 주문 상태 확인 중 오류 발생: {e}")
             raise
 
+    def _get_chunk_status(self, chunk):
+        try:
+            response = self.get_multiple_order_status(chunk)
+        except Exception as e:
+            response = e
+        result, missing = split_status_response(chunk, response)
+
+        # 실패한 chunk(또는 누락된 주문)만 개별 조회
+        responses = []
+        for order_id in missing:
+            try:
+                responses.append(self.get_order_status(order_id))
+            except Exception as e:
+                responses.append(e)
+        return merge_single_statuses(result, missing, responses)
+
+    # 주문번호 목록을 chunk 단위 다중 조회로 확인하고 {주문번호: 응답} 으로 반환
+    def get_order_status_map(self, order_ids, chunk_size=None):
+        order_ids = unique_order_ids(order_ids)
+        # 캐시에 있는 주문은 API 조회 생략
+        cached = self.cache.get_many(order_ids) if self.cache else {}
+        status_map = {}
+        for chunk in status_chunks(order_ids, cached, chunk_size):
+            status_map.update(self._get_chunk_status(chunk))
+        if self.cache:
+            self.cache.put_many(status_map)
+        return finish_status_map(cached, status_map)
+
     # 계정 잔액을 확인
     def get_balance(self):
         params = {
@@ -170,13 +989,187 @@ class StoreAPI:
         }
 
         try:
-            response = requests.post(self.base_url, data=params)
+            response = self._send(params)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
-            print(f"잔액 확인 중 오류 발생: {e}")
+            logger.warning(f"잔액 확인 중 오류 발생: {e}")
+            raise
+
+def unique_order_ids(order_ids):
+    return list(dict.fromkeys(str(order_id) for order_id in order_ids))
+
+# 캐시에 없는 주문번호를 다중 조회 단위로 나눈다
+def status_chunks(order_ids, cached, chunk_size=None):
+    chunk_size = chunk_size or status_chunk_size
+    order_ids = [order_id for order_id in order_ids if order_id not in cached]
+    return [order_ids[i:i + chunk_size] for i in range(0, len(order_ids), chunk_size)]
+
+# 다중 조회 응답(또는 예외)을 chunk 의 {주문번호: 응답} 과 개별 조회가 필요한 주문번호로 나눈다
+def split_status_response(chunk, response):
+    if not isinstance(response, dict):
+        error = response if isinstance(response, Exception) else f"예상하지 못한 응답 형식: {response}"
+        logger.warning(f"다중 주문 상태 조회 실패, 개별 조회로 전환: {error}")
+        return {}, list(chunk)
+    result = {}
+    missing = []
+    for order_id in chunk:
+        item = response.get(order_id)
+        if isinstance(item, dict) and 'error' not in item:
+            result[order_id] = item
+        else:
+            missing.append(order_id)
+    return result, missing
+
+# 개별 조회 응답(또는 예외)을 chunk 결과에 합친다
+def merge_single_statuses(result, missing, responses):
+    for order_id, response in zip(missing, responses):
+        if isinstance(response, Exception):
+            logger.warning(f"{order_id} 주문 상태 개별 조회 실패: {response}")
+        elif not isinstance(response, dict) or 'error' in response:
+            # 오류 응답은 결과와 캐시에 넣지 않는다 (split_status_response 와 동일)
+            logger.warning(f"{order_id} 주문 상태 개별 조회 오류 응답: {response}")
+        else:
+            result[order_id] = response
+    return result
+
+def finish_status_map(cached, status_map):
+    status_map = {**cached, **status_map}
+    # 캐시 hit 도 포함한 최종 결과를 기록해 replay 가 캐시 상태와 무관하게 재현되도록 한다
+    recorder.record_status_map(status_map)
+    return status_map
+
+def is_retryable_store_error(e):
+    # 429, 5xx 응답과 네트워크 오류만 재시도
+    if isinstance(e, httpx.HTTPStatusError):
+        status = e.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(e, httpx.TransportError)
+
+
+class AsyncStoreAPI:
+    def __init__(self, api_key, max_concurrency=None, timeout=None, cache=None, base_url=None):
+        self.api_key = api_key
+        self.base_url = base_url or store_basic_url
+        self.cache = cache
+        max_concurrency = max_concurrency or store_max_concurrency
+        # 모든 요청이 하나의 keep-alive 커넥션 풀을 공유
+        self.client = httpx.AsyncClient(
+            timeout=timeout or store_api_timeout,
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency
+            )
+        )
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    @backoff.on_exception(
+        backoff.expo,
+        (httpx.HTTPStatusError, httpx.TransportError),
+        max_tries=5,
+        giveup=lambda e: not is_retryable_store_error(e),
+        on_backoff=lambda details: metrics.incr('store_api_retries')
+    )
+    async def _post(self, params):
+        # 동시 요청 수 제한 (backoff 대기 중에는 슬롯을 반납)
+        async with self.semaphore:
+            metrics.incr('store_api_calls')
+            with metrics.timer(f"store_api.{params['action']}"):
+                response = await self.client.post(self.base_url, data={'key': self.api_key, **params})
+        response.raise_for_status()
+        data = response.json()
+        recorder.record_store_response(params, data)
+        return data
+
+    async def create_order(self, service_id, link, quantity, runs=None, interval=None):
+        params = {
+            'action': 'add',
+            'service': service_id,
+            'link': link,
+            'quantity': quantity
+        }
+
+        try:
+            return await self._post(params)
+        except httpx.HTTPError as e:
+            logger.warning(f"주문 생성 중 오류 발생: {e}")
+            raise
+
+    # 주문 상태 확인
+    async def get_order_status(self, order_id):
+        params = {
+            'action': 'status',
+            'order': order_id
+        }
+
+        try:
+            return await self._post(params)
+        except httpx.HTTPError as e:
+            logger.warning(f"주문 상태 확인 중 오류 발생: {e}")
+            raise
+
+    # 여러 주문의 상태를 한 번에 확인
+    async def get_multiple_order_status(self, order_ids):
+        params = {
+            'action': 'status',
+            'orders': ','.join(map(str, order_ids))
+        }
+
+        try:
+            return await self._post(params)
+        except httpx.HTTPError as e:
+            logger.warning(f"다중 주문 상태 확인 중 오류 발생: {e}")
             raise
 
+    # 계정 잔액을 확인
+    async def get_balance(self):
+        params = {
+            'action': 'balance'
+        }
+
+        try:
+            return await self._post(params)
+        except httpx.HTTPError as e:
+            logger.warning(f"잔액 확인 중 오류 발생: {e}")
+            raise
+
+    async def _get_chunk_status(self, chunk):
+        try:
+            response = await self.get_multiple_order_status(chunk)
+        except Exception as e:
+            response = e
+        result, missing = split_status_response(chunk, response)
+
+        # 실패한 chunk(또는 누락된 주문)만 개별 조회
+        responses = await asyncio.gather(
+            *(self.get_order_status(order_id) for order_id in missing),
+            return_exceptions=True
+        )
+        return merge_single_statuses(result, missing, responses)
+
+    # 주문번호 목록을 chunk 단위로 동시에 조회하고 {주문번호: 응답} 으로 반환
+    async def get_order_status_map(self, order_ids, chunk_size=None):
+        order_ids = unique_order_ids(order_ids)
+        # 캐시에 있는 주문은 API 조회 생략 (SQLite 조회/저장은 이벤트 루프를 막지 않도록 스레드에서)
+        cached = await asyncio.to_thread(self.cache.get_many, order_ids) if self.cache else {}
+        chunks = status_chunks(order_ids, cached, chunk_size)
+
+        status_map = {}
+        for result in await asyncio.gather(*(self._get_chunk_status(chunk) for chunk in chunks)):
+            status_map.update(result)
+        if self.cache:
+            await asyncio.to_thread(self.cache.put_many, status_map)
+        return finish_status_map(cached, status_map)
+
 # if not os.path.exists(json_str):
 #     print(f"JSON 키 파일이 존재하지 않습니다: {json_str}")
 
@@ -197,26 +1190,131 @@ def get_sheet_data(sheet):
     
     return df
 
-def process_manual_order(sheet, orders, hook_url, sheet_manager):
+# 마켓주문번호 셀 하나에 여러 주문번호가 줄바꿈/구분자로 합쳐져 있을 수 있음
+ORDER_NUM_SEPARATOR = re.compile(r'[\s,;/|]+')
+
+
+class MarketOrderIndex:
+    """market_store_order_list 시트를 사이클마다 한 번 인덱싱해 주문번호 조회를 O(1)로 처리"""
+
+    def __init__(self, shipping_orders):
+        self.df = shipping_orders
+        self.shipping_rows = {}  # 주문번호 토큰 -> 배송중 행 위치 목록
+        self.shipping_cells = []  # (셀 값, 행 위치) - 토큰 조회 실패 시 부분일치 검색용
+        self.rows_by_cell = {}  # 마켓주문번호 셀 값 -> 전체 행 위치 목록
+
+        if shipping_orders.empty:
+            return
+
+        cells = shipping_orders['마켓주문번호'].tolist()
+        statuses = shipping_orders['주문상태'].tolist()
+        for pos, (cell, status) in enumerate(zip(cells, statuses)):
+            self.rows_by_cell.setdefault(cell, []).append(pos)
+            # 기존 str.contains(na=False)와 동일하게 문자열 셀만 대상
+            if status != '배송중' or not isinstance(cell, str):
+                continue
+            self.shipping_cells.append((cell, pos))
+            for token in set(ORDER_NUM_SEPARATOR.split(cell)):
+                if token:
+                    self.shipping_rows.setdefault(token, []).append(pos)
+
+    # 마켓주문번호가 포함된 배송중 행의 위치
+    def find_shipping_positions(self, market_order_num):
+        positions = self.shipping_rows.get(market_order_num)
+        if positions is None:
+            # 구분자 없이 합쳐진 셀 등은 기존처럼 부분일치로 찾는다
+            positions = [pos for cell, pos in self.shipping_cells if market_order_num in cell]
+        return positions
+
+    # 마켓주문번호가 포함된 배송중 행 조회
+    def find_shipping_orders(self, market_order_num):
+        return self.df.iloc[self.find_shipping_positions(market_order_num)]
+
+    # 마켓주문번호 셀 값이 정확히 일치하는 행 조회
+    def find_rows(self, market_order_sheet_num):
+        return self.df.iloc[self.rows_by_cell.get(market_order_sheet_num, [])]
+
+
+# 알림을 보낸 / manual_order_list 에 추가한 (마켓주문번호, 상태) 목록은 따로 기록
+# (알림이 실패해도 이미 추가한 행은 다음 사이클에 다시 추가하지 않는다)
+ALERTED_MANUAL_ORDERS_FILE = 'alerted_manual_orders.json'
+APPENDED_MANUAL_ORDERS_FILE = 'appended_manual_orders.json'
+
+
+def load_manual_order_keys(state_dir, file_name):
+    path = os.path.join(state_dir, file_name)
+    if not os.path.exists(path):
+        return set()
     try:
-        for order in orders:
-            add_manual_order_sheet(sheet, order)
+        with open(path, encoding='utf-8') as f:
+            return {tuple(item) for item in json.load(f)}
     except Exception as e:
-        print(f"수동필요 주문 시트 추가 처리 중 오류 발생: {str(e)}")
-        traceback.print_exc()
+        logger.warning(f"{file_name} 로드 실패: {e}")
+        return set()
+
+def save_manual_order_keys(state_dir, file_name, keys):
+    os.makedirs(state_dir, exist_ok=True)
+    path = os.path.join(state_dir, file_name)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(sorted(list(item) for item in keys), f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def manual_order_key(order):
+    return (str(order[0]), str(order[-1]))
+
+# 이전 사이클에서 이미 알린 주문과 같은 사이클 내 중복을 제외한 새 수동처리 주문
+def plan_manual_orders(orders, alerted):
+    new_orders = []
+    seen = set()
+    for order in orders:
+        key = manual_order_key(order)
+        if key in alerted or key in seen:
+            continue
+        seen.add(key)
+        new_orders.append(order)
+    return new_orders
 
+def process_manual_order(sheet, orders, hook_url, sheet_manager):
+    state_dir = sheet_manager.config.state_dir
+    alerted = load_manual_order_keys(state_dir, ALERTED_MANUAL_ORDERS_FILE)
+    recorder.record('alerted_manual_orders', sorted(list(key) for key in alerted))
+    new_orders = plan_manual_orders(orders, alerted)
+
+    if not new_orders:
+        logger.info('새로 알릴 수동처리 주문이 없습니다.')
+        return
+
+    # 알림만 실패했던 주문은 행을 다시 추가하지 않고 알림만 재시도
+    appended = load_manual_order_keys(state_dir, APPENDED_MANUAL_ORDERS_FILE)
+    append_orders = plan_manual_orders(new_orders, appended)
+    order_store = get_order_store(sheet_manager.config) if order_store_enabled else None
     try:
-        for order in orders:
-            alert_manual_orders(hook_url, sheet_manager, orders)
+        if append_orders:
+            if order_store:
+                order_store.append_rows('manual_order_list', build_manual_rows(append_orders))
+                added = True
+            else:
+                added = add_manual_order_sheet(sheet, append_orders) is not None
+                sheet_manager.invalidate('manual_order_list')
+            if added:
+                save_manual_order_keys(state_dir, APPENDED_MANUAL_ORDERS_FILE,
+                                       appended | {manual_order_key(order) for order in append_orders})
     except Exception as e:
-        print(f"수동필요 주문 알림 처리 중 오류 발생: {str(e)}")
-        traceback.print_exc()
-
-def add_manual_order_sheet(sheet, order):
-    print('manual_order 입력')
-    print('주문', order), 
+        logger.exception(f"수동필요 주문 시트 추가 처리 중 오류 발생: {str(e)}")
 
     try:
+        alerted_keys = alert_manual_orders(hook_url, sheet_manager, new_orders, order_store)
+        if alerted_keys:
+            save_manual_order_keys(state_dir, ALERTED_MANUAL_ORDERS_FILE, alerted | set(alerted_keys))
+    except Exception as e:
+        logger.exception(f"수동필요 주문 알림 처리 중 오류 발생: {str(e)}")
+
+# manual_order_list 에 추가할 행
+def build_manual_rows(orders):
+    rows = []
+    for order in orders:
+        log_order('수동주문 입력', order[0], order[1], order[-1])
         row_data = [
             str(order[0]),
             str(order[1]),
@@ -233,35 +1331,46 @@ def add_manual_order_sheet(sheet, order):
 
         if len(row_data) != 11:  # 컬럼 수와 일치하는지 확인
             raise ValueError(f"Expected 11 columns, got {len(row_data)}")
-        
-        sheet.append_row(row_data)
-        print(f"수동주문 정보가 시트에 추가되었습니다: {row_data}")
-        return order
+        rows.append(row_data)
+    return rows
 
-    
-    except Exception as e:
-        print(f"시트 추가 중 오류 발생: {str(e)}")
-        traceback.print_exc()
+def add_manual_order_sheet(sheet, orders):
+    rows = build_manual_rows(orders)
 
-def alert_manual_orders(hook_url, sheet_manager, orders):
+    try:
+        # 모든 수동주문을 append_rows 한 번으로 추가
+        sheet.append_rows(rows)
+        logger.info(f"수동주문 정보 {len(rows)}건이 시트에 추가되었습니다.")
+        return orders
 
-    df = sheet_manager.get_sheet_data('manual_order_list')
+    except Exception as e:
+        logger.exception(f"시트 추가 중 오류 발생: {str(e)}")
+
+def alert_manual_orders(hook_url, sheet_manager, orders, order_store=None):
+    # manual_order_list 는 알림 전에 한 번만 읽는다 (로컬 사본에는 아직 반영 전인 추가 행도 포함)
+    if order_store:
+        df = order_store.frame('manual_order_list')
+    else:
+        df = sheet_manager.get_sheet_data('manual_order_list')
+    # 처리필요 상태의 마켓주문번호를 한 번만 모아 주문별 조회에 사용
+    pending_order_nums = set(df.loc[df['처리상태'] == '처리필요', '마켓주문번호']) if not df.empty else set()
 
+    alerted_keys = []
     for order in orders:
         order_num = order[0]
-        user_info = order[2].split('\n')
-        username = user_info[0]
-        user_id = user_info[2]
-        order_time = order[8].split('\n')[1].replace("(", '').replace(")", '')
-        order_service = order[7]
         status = order[-1]
 
-        filtered_manual = df[
-            (df['처리상태'] == '처리필요') &  
-            (df['마켓주문번호'] == order_num) 
-        ]
+        if order_num not in pending_order_nums:
+            log_order('알릴 주문이 아닙니다.', order_num, status=status)
+            continue
+
+        try:
+            user_info = order[2].split('\n')
+            username = user_info[0]
+            user_id = user_info[2]
+            order_time = order[8].split('\n')[1].replace("(", '').replace(")", '')
+            order_service = order[7]
 
-        if len(filtered_manual) > 0:
             payload = {
                 "order_num": order_num,
                 "user_id": user_id,
@@ -271,57 +1380,332 @@ def alert_manual_orders(hook_url, sheet_manager, orders):
             }
 
             response = requests.post(url=hook_url, json=payload)
-            print("응답 상태 코드:", response.status_code)
-            print("응답 본문:", response.text)
-            print('알람완료')
-        else:
-            print("알릴 주문이 아닙니다.")
-    print('모든 알림 완료')
-    return 
+            if response.ok:
+                alerted_keys.append(manual_order_key(order))
+                log_order('알람완료', order_num, status=status)
+            else:
+                log_order(f"알림 응답 {response.status_code}: {response.text}", order_num, status=status, level=logging.WARNING)
+        except Exception as e:
+            logger.warning(f"{order_num} 알림 실패: {e}", extra={'market_order_num': str(order_num)})
+    logger.info(f"수동처리 주문 알림 {len(alerted_keys)}/{len(orders)}건 완료")
+    return alerted_keys
+
+# lean 프로필에서 CDP 로 차단할 리소스 (이미지, 미디어, 폰트, 외부 분석 스크립트)
+LEAN_BLOCKED_URLS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico', '*.bmp',
+    '*.mp4', '*.webm', '*.mp3', '*.ogg',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+    '*facebook.net*', '*connect.facebook.com*', '*analytics.naver.com*',
+    '*wcs.naver.net*', '*kakao.com/pixel*', '*hotjar.com*', '*clarity.ms*',
+]
 
 # 1. Selenium WebDriver 설정
-def init_driver():
+@metrics.timed('init_driver')
+def init_driver(profile=None, config=None):
+    profile = profile or browser_profile
+    config = config or MallConfig.from_env()
     chrome_options = Options()
     chrome_options.add_argument('--no-sandbox')
     chrome_options.add_argument('--headless')
     chrome_options.add_argument('--disable-dev-shm-usage')
     chrome_options.add_argument('--disable-gpu')
-    chrome_options.add_argument('--user-data-dir=/home/chrome/chrome-data')
-    chrome_options.add_argument('--remote-debugging-port=9222') 
+    chrome_options.add_argument(f'--user-data-dir={config.chrome_data_dir}')
+    chrome_options.add_argument(f'--remote-debugging-port={config.debugging_port}')
+    if profile == 'lean':
+        # DOMContentLoaded 까지만 대기
+        chrome_options.page_load_strategy = 'eager'
+        chrome_options.add_argument(f'--window-size={lean_window_size}')
+        chrome_options.add_argument('--disable-extensions')
+        chrome_options.add_argument('--disable-background-networking')
+        chrome_options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
     driver = webdriver.Chrome(options=chrome_options)
+    # 로그의 시간 측정은 이 브라우저를 만든 프로필로 표시
+    driver.browser_profile = profile
+    apply_lean_blocking(driver)
     return driver
 
+def driver_profile(driver):
+    return getattr(driver, 'browser_profile', browser_profile)
+
+# CDP 의 URL 차단은 명령을 보낸 탭에만 적용되므로 새 탭마다 다시 호출해야 한다
+def apply_lean_blocking(driver):
+    if driver_profile(driver) != 'lean':
+        return
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': LEAN_BLOCKED_URLS})
+
+# 페이지 로드 시간을 프로필과 함께 출력
+def timed_get(driver, url, label):
+    started = time.monotonic()
+    driver.get(url)
+    logger.info(f"[{driver_profile(driver)}] {label} 페이지 로드 {time.monotonic() - started:.2f}초")
+
 
 # 2. Cafe24 로그인
-def cafe24_login(driver, login_page, wait):
-    driver.get(login_page)
+@metrics.timed('cafe24_login')
+def cafe24_login(driver, login_page, wait, config=None):
+    config = config or MallConfig.from_env()
+    timed_get(driver, login_page, '로그인')
     try:
         wait.until(EC.all_of(
             EC.presence_of_element_located((By.NAME, "loginId")),
             EC.presence_of_element_located((By.NAME, "loginPasswd"))
         ))
-        driver.find_element(By.NAME, "loginId").send_keys(username)  # Admin ID 입력
-        driver.find_element(By.NAME, "loginPasswd").send_keys(password)  # 비밀번호 입력
+        driver.find_element(By.NAME, "loginId").send_keys(config.username)  # Admin ID 입력
+        driver.find_element(By.NAME, "loginPasswd").send_keys(config.password)  # 비밀번호 입력
         try:
             login_btn = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "button.btnStrong.large")))
             driver.execute_script("arguments[0].click();", login_btn)
             pw_change_btn = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "#iptBtnEm")))
             driver.execute_script("arguments[0].click();", pw_change_btn)
-            wait.until(EC.url_to_be(dashboard_page))
+            wait.until(EC.url_to_be(config.dashboard_page))
         except Exception as e:
-            print(f"클릭 중 오류 발생: {e}")
+            logger.warning(f"클릭 중 오류 발생: {e}")
     except TimeoutException:
-        print("20초 동안 버튼이 클릭 가능한 상태가 되지 않았습니다.")
+        logger.warning("20초 동안 버튼이 클릭 가능한 상태가 되지 않았습니다.")
     return driver
 
 
+# 로그인 세션이 유지되는지 확인 (대시보드 접근 시 로그인 페이지로 이동하지 않으면 로그인 상태)
+def is_logged_in(driver, wait, config):
+    try:
+        driver.get(config.dashboard_page)
+        wait.until(lambda d: d.execute_script("return document.readyState") != 'loading')
+        return driver.current_url.startswith(config.dashboard_page)
+    except Exception as e:
+        logger.warning(f"로그인 상태 확인 실패: {e}")
+        return False
+
+
+SESSION_COOKIES_FILE = 'cafe24_cookies.json'
+# CDP Network.setCookies 가 받는 쿠키 필드
+COOKIE_FIELDS = ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'sameSite', 'expires')
+
+
+# 로그인 성공 후 모든 도메인의 세션 쿠키를 디스크에 저장
+def save_session_cookies(driver, login_seconds, config):
+    try:
+        cookies = driver.execute_cdp_cmd('Network.getAllCookies', {})['cookies']
+        os.makedirs(config.state_dir, exist_ok=True)
+        path = os.path.join(config.state_dir, SESSION_COOKIES_FILE)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'login_seconds': login_seconds, 'cookies': cookies}, f)
+        os.replace(tmp_path, path)
+        logger.info(f"세션 쿠키 {len(cookies)}개 저장")
+    except Exception as e:
+        logger.warning(f"세션 쿠키 저장 실패: {e}")
+
+# 저장된 쿠키를 복원하고 로그인 상태를 확인, 복원 성공 여부 반환
+def restore_session_cookies(driver, wait, config):
+    path = os.path.join(config.state_dir, SESSION_COOKIES_FILE)
+    if not os.path.exists(path):
+        return False
+
+    started = time.monotonic()
+    try:
+        with open(path, encoding='utf-8') as f:
+            saved = json.load(f)
+        cookies = [
+            {key: cookie[key] for key in COOKIE_FIELDS if key in cookie and not (key == 'expires' and cookie.get('session'))}
+            for cookie in saved.get('cookies', [])
+        ]
+        driver.execute_cdp_cmd('Network.setCookies', {'cookies': cookies})
+    except Exception as e:
+        logger.warning(f"세션 쿠키 복원 실패: {e}")
+        return False
+
+    if not is_logged_in(driver, wait, config):
+        logger.warning("저장된 세션이 만료되어 다시 로그인합니다.")
+        return False
+
+    probe_seconds = time.monotonic() - started
+    login_seconds = saved.get('login_seconds') or 0
+    logger.info(f"저장된 세션으로 로그인 생략 ({probe_seconds:.1f}초, 약 {max(login_seconds - probe_seconds, 0):.1f}초 절약)")
+    return True
+
+# 전체 로그인 후 성공하면 쿠키 저장
+def login(driver, wait, config):
+    started = time.monotonic()
+    cafe24_login(driver, config.login_page, wait, config)
+    login_seconds = time.monotonic() - started
+    logger.info(f"Cafe24 로그인 {login_seconds:.1f}초")
+    if driver.current_url.startswith(config.dashboard_page):
+        save_session_cookies(driver, login_seconds, config)
+
+
+# pid 와 모든 하위 프로세스의 RSS 합계(MB), /proc 이 없는 환경에서는 None
+def process_tree_rss_mb(pid):
+    if not os.path.isdir('/proc'):
+        return None
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", encoding='utf-8') as f:
+                # comm 에 공백/괄호가 있을 수 있어 마지막 ')' 뒤에서 ppid 를 읽는다
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    total_kb = 0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        stack.extend(children.get(current, []))
+        try:
+            with open(f"/proc/{current}/status", encoding='utf-8') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total_kb += int(line.split()[1])
+                        break
+        except OSError:
+            continue
+    return total_kb / 1024
+
+
+class DriverManager:
+    """사이클 간에 브라우저 하나를 유지하고 상태가 나쁘거나 N회 사용 후에만 재시작"""
+
+    def __init__(self, config=None, max_cycles=None, max_memory_mb=None, profile=None):
+        self.config = config or MallConfig.from_env()
+        self.profile = profile or browser_profile
+        self.driver = None
+        self.cycles = 0
+        self.logged_in = False
+        self.max_cycles = max_cycles or driver_max_cycles
+        self.max_memory_mb = max_memory_mb or driver_max_memory_mb
+
+    def is_healthy(self):
+        try:
+            # 응답 여부 확인
+            self.driver.execute_script("return 1")
+        except Exception as e:
+            logger.warning(f"브라우저 응답 없음: {e}")
+            return False
+
+        # chromedriver 와 그 아래 Chrome 프로세스 전체의 RSS
+        try:
+            memory_mb = process_tree_rss_mb(self.driver.service.process.pid)
+        except Exception as e:
+            logger.warning(f"브라우저 메모리 사용량 확인 실패: {e}")
+            memory_mb = None
+        if memory_mb is not None and memory_mb > self.max_memory_mb:
+            logger.warning(f"브라우저 메모리 사용량 초과: {memory_mb:.0f}MB")
+            return False
+        return True
+
+    def acquire(self):
+        if self.driver is not None:
+            if self.cycles >= self.max_cycles:
+                logger.info(f"브라우저 {self.cycles}회 사용, 재시작")
+                self.recycle()
+            elif not self.is_healthy():
+                self.recycle()
+
+        if self.driver is None:
+            self.driver = init_driver(profile=self.profile, config=self.config)
+            self.cycles = 0
+            self.logged_in = False
+
+        wait = WebDriverWait(self.driver, timeout=20)
+        # 새 브라우저는 저장된 쿠키로 복원을 시도, 재사용 브라우저는 세션 유지 여부만 확인
+        if self.logged_in:
+            self.logged_in = is_logged_in(self.driver, wait, self.config)
+        else:
+            self.logged_in = restore_session_cookies(self.driver, wait, self.config)
+
+        if not self.logged_in:
+            login(self.driver, wait, self.config)
+            self.logged_in = True
+
+        self.cycles += 1
+        return self.driver
+
+    # 실패한 사이클 이후에는 브라우저를 재시작
+    def release(self, failed=False):
+        if failed:
+            self.recycle()
+
+    def recycle(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception as e:
+                logger.warning(f"브라우저 종료 실패: {e}")
+        self.driver = None
+        self.logged_in = False
+
+    def close(self):
+        self.recycle()
+
+
+_driver_managers = {}
+
+# 몰마다 하나의 DriverManager (브라우저) 를 유지
+def get_driver_manager(config=None):
+    config = config or MallConfig.from_env()
+    if config.name not in _driver_managers:
+        _driver_managers[config.name] = DriverManager(config)
+    return _driver_managers[config.name]
+
+def close_driver_managers():
+    for manager in _driver_managers.values():
+        manager.close()
+
+
+# 주문 행마다 주문번호 텍스트, 체크박스 유무, 표시된 셀 값을 한 번에 추출
+SCRAPE_ORDER_ROWS_SCRIPT = """
+const rows = document.querySelectorAll('#searchResultList tbody.center');
+return Array.from(rows).map(row => {
+    const orderNum = row.querySelector('td.orderNum');
+    return {
+        order_num_text: orderNum ? orderNum.innerText : null,
+        has_checkbox: row.querySelector('.chkbox') !== null,
+        cells: Array.from(row.querySelectorAll('td')).map(td => td.innerText.trim())
+    };
+});
+"""
+
+# 주문 행이 있거나 '검색된 주문내역이 없습니다' 가 표시될 때까지 대기
+ORDER_LIST_LOADED = EC.any_of(
+    EC.all_of(
+        EC.presence_of_element_located((By.CSS_SELECTOR, "td.orderNum")),
+        EC.presence_of_element_located((By.CSS_SELECTOR, ".chkbox")),
+    ),
+    EC.presence_of_element_located((By.CSS_SELECTOR, "#searchResultList tbody.empty")),
+)
+
+# 체크박스 id/값은 저장하지 않는다: select_orders 가 페이지에서 주문번호로 체크박스를 찾는다
+def parse_order_rows(rows, page_url=None, page_key=None):
+    order_list = []
+    for row in rows:
+        order_num_text = row.get('order_num_text')
+        if not order_num_text:
+            continue
+        order_num = order_num_text.split('\n')[1].split(' ')[0]
+        if not row.get('has_checkbox'):
+            log_order('no chkbox', order_num, level=logging.WARNING)
+
+        order_list.append({
+            "market_order_num": order_num,
+            "cafe24_order_num": order_num,  # check_order 에서 바뀌지 않는 Cafe24 주문번호
+            "fields": row.get('cells'),
+            "page_url": page_url,
+            "page_key": page_key,
+        })
+    return order_list
+
 # 3. 배송중 주문 정보 크롤링
+@metrics.timed('scrape_orders')
 def scrape_orders(driver, shipping_order_page, wait):
-    driver.get(shipping_order_page)
+    if scrape_mode in ('paged', 'windowed'):
+        return scrape_all_orders(driver, shipping_order_page, wait)
 
-    # 주문 정보 크롤링
-    orders = []
-    order_list = []
+    timed_get(driver, shipping_order_page, '배송중 목록')
 
     try:
         wait.until(EC.all_of(
@@ -333,163 +1717,356 @@ def scrape_orders(driver, shipping_order_page, wait):
             EC.presence_of_element_located((By.CSS_SELECTOR, ".chkbox")),
         ))
     except TimeoutException:
-        print("20초 동안 어떤 조건도 만족하지 않았습니다.")
+        logger.warning("20초 동안 어떤 조건도 만족하지 않았습니다.")
         return [[], '']
 
-    order_element = driver.find_element(By.CSS_SELECTOR, "#searchResultList")
-    orders = order_element.find_elements(By.CSS_SELECTOR, "tbody.center")
+    # 주문 테이블 전체를 execute_script 한 번으로 가져온다
+    rows = driver.execute_script(SCRAPE_ORDER_ROWS_SCRIPT)
     eshipEnd_element = driver.find_element(By.CSS_SELECTOR, "#eShippedEndBtn")
-    print('주문수량', len(orders))
-
-    if len(orders) > 0:
-        for order in orders:
-            try:
-                order_num_element = order.find_element(By.CSS_SELECTOR, "td.orderNum")
-            except NoSuchElementException:
-                continue
-            try:
-                order_chk = order.find_element(By.CSS_SELECTOR, ".chkbox")
-            except NoSuchElementException:
-                print('no chkbox')
-
-            order_num_text = order_num_element.text
-            order_num = order_num_text.split('\n')[1].split(' ')[0]
+    logger.info(f"주문수량 {len(rows)}")
 
-            order_list.append({
-                "market_order_num": order_num,
-                "check_element": order_chk,
-            })
-    else:
-        print('검색된 주문내역이 없습니다.')
+    # 주문 정보 크롤링
+    order_list = parse_order_rows(rows)
+    if not order_list:
+        logger.info('검색된 주문내역이 없습니다.')
 
-    print('배송중 주문목록 작성완료')
+    logger.info('배송중 주문목록 작성완료')
     return [order_list, eshipEnd_element]
 
-
-async def check_order(orders, shipping_orders, store_api):
+def build_shipping_url(shipping_order_page, page, window=None):
+    parsed = urlparse(shipping_order_page)
+    query = parse_qs(parsed.query)
+    query[shipping_page_size_param] = [str(shipping_page_size)]
+    query[shipping_page_param] = [str(page)]
+    if window:
+        query[shipping_start_date_param] = [window[0].strftime('%Y-%m-%d')]
+        query[shipping_end_date_param] = [window[1].strftime('%Y-%m-%d')]
+    return urlunparse(parsed._replace(query=urlencode(query, doseq=True)))
+
+# 조회 기간을 scrape_window_days 단위로 분할
+def build_date_windows(today=None):
+    today = today or datetime.now().date()
+    windows = []
+    end = today
+    first_day = today - timedelta(days=scrape_lookback_days)
+    while end >= first_day:
+        start = max(end - timedelta(days=scrape_window_days - 1), first_day)
+        windows.append((start, end))
+        end = start - timedelta(days=1)
+    return windows
+
+# 여러 URL을 각각 새 탭에서 동시에 로드한 뒤 탭별로 주문 행을 추출
+def scrape_tabs(driver, urls, wait):
+    main_handle = driver.current_window_handle
+    handles = []
+    started = time.monotonic()
+    for url in urls:
+        # 빈 탭을 열어 차단 목록을 적용한 뒤 이동 (location 변경은 로드를 기다리지 않아 탭들이 동시에 로드된다)
+        existing = set(driver.window_handles)
+        driver.execute_script("window.open('about:blank', '_blank');")
+        handle = (set(driver.window_handles) - existing).pop()
+        handles.append(handle)
+        driver.switch_to.window(handle)
+        apply_lean_blocking(driver)
+        driver.execute_script("window.location.href = arguments[0];", url)
+
+    results = []
+    try:
+        for handle in handles:
+            driver.switch_to.window(handle)
+            try:
+                wait.until(ORDER_LIST_LOADED)
+                results.append(driver.execute_script(SCRAPE_ORDER_ROWS_SCRIPT))
+            except TimeoutException:
+                logger.warning(f"{driver.current_url} 페이지 로드 시간 초과")
+                results.append(None)
+        logger.info(f"[{driver_profile(driver)}] 배송중 목록 {len(urls)}개 탭 로드 {time.monotonic() - started:.2f}초")
+    finally:
+        for handle in handles:
+            try:
+                driver.switch_to.window(handle)
+                driver.close()
+            except Exception:
+                pass
+        driver.switch_to.window(main_handle)
+    return results
+
+# 최대 페이지 크기로 모든 페이지(및 기간)를 순회해 중복 없는 주문 목록을 만든다
+# 실제 페이지 크기는 관리자 화면이 정하므로 행 수로 마지막 페이지를 판단하지 않고,
+# 새 주문번호가 없는 페이지(빈 페이지, 또는 파라미터를 무시해 같은 페이지가 다시 온 경우)에서 멈춘다
+def scrape_all_orders(driver, shipping_order_page, wait):
+    windows = build_date_windows() if scrape_mode == 'windowed' else [None]
+    pages = {idx: 1 for idx in range(len(windows))}  # 기간별 다음에 읽을 페이지
+    order_list = []
+    seen = set()
+
+    while pages:
+        targets = list(pages.items())
+        for start in range(0, len(targets), scrape_max_tabs):
+            batch = targets[start:start + scrape_max_tabs]
+            urls = [build_shipping_url(shipping_order_page, page, windows[idx]) for idx, page in batch]
+            for (idx, page), url, rows in zip(batch, urls, scrape_tabs(driver, urls, wait)):
+                if rows is None:
+                    pages.pop(idx)
+                    continue
+                new_orders = 0
+                for order in parse_order_rows(rows, page_url=url, page_key=(idx, page)):
+                    if order['market_order_num'] in seen:
+                        continue
+                    seen.add(order['market_order_num'])
+                    order_list.append(order)
+                    new_orders += 1
+                if not new_orders:
+                    pages.pop(idx)
+                elif page >= scrape_max_pages:
+                    logger.warning(f"배송중 목록 {page}페이지에서 최대 페이지 수 도달, 이후 페이지는 읽지 않습니다.")
+                    pages.pop(idx)
+                else:
+                    pages[idx] = page + 1
+
+    logger.info(f"배송중 주문목록 작성완료: {len(order_list)}건")
+    # 배송완료 처리는 process_eship 에서 주문이 있는 페이지를 다시 열어 진행
+    return [order_list, None]
+
+
+# 주문번호 목록에 해당하는 체크박스만 체크하고 실제로 체크된 주문번호를 반환
+SELECT_ORDERS_SCRIPT = """
+const targets = new Set(arguments[0]);
+const checked = [];
+document.querySelectorAll('#searchResultList tbody.center').forEach(row => {
+    const orderNum = row.querySelector('td.orderNum');
+    const chk = row.querySelector('.chkbox');
+    if (!orderNum || !chk) return;
+    const lines = orderNum.innerText.split('\\n');
+    const num = lines.length > 1 ? lines[1].split(' ')[0] : null;
+    if (chk.checked !== targets.has(num)) chk.click();
+    if (chk.checked) checked.push(num);
+});
+return checked;
+"""
+
+# 체크박스를 한 번에 선택하고 기대한 주문과 일치하는지 확인
+def select_orders(driver, orders):
+    expected = {order['cafe24_order_num'] for order in orders}
+    selected = set(driver.execute_script(SELECT_ORDERS_SCRIPT, sorted(expected)))
+
+    missing = expected - selected
+    unexpected = selected - expected
+    if missing:
+        logger.warning(f"체크되지 않은 주문 {len(missing)}건: {sorted(missing)}")
+    if unexpected:
+        logger.warning(f"예상하지 않은 주문 {len(unexpected)}건이 체크됨: {sorted(unexpected)}")
+    logger.info(f"주문 {len(selected)}/{len(expected)}건 선택 완료")
+    return selected, missing, unexpected
+
+
+async def check_order(orders, order_index, store_api, chunk_size=None, stats=None):
     processed_orders = []
     manual_process_orders = []
+    pending_cnt = 0  # 아직 완료되지 않은 스토어 주문 수
+
+    # 1. 주문별 시트 행을 먼저 찾고 조회할 스토어 주문번호를 모은다
+    order_rows = []
+    store_order_nums = []
     for order in orders:
         try:
             market_order_num = order.get('market_order_num')
-            filtered_orders = shipping_orders[
-                (shipping_orders['마켓주문번호'].str.contains(market_order_num, na=False)) &
-                (shipping_orders['주문상태'] == '배송중')
-            ]
+            filtered_orders = order_index.find_shipping_orders(market_order_num)
+            order_rows.append((order, filtered_orders))
+            store_order_nums.extend(filtered_orders['스토어주문번호'].tolist())
+        except Exception as e:
+            logger.exception(f"주문 처리 중 오류 발생: {e}", extra={'market_order_num': order.get('market_order_num')})
+
+    # 2. 스토어 주문 상태를 chunk 단위로 한 번에 조회
+    status_map = await store_api.get_order_status_map(store_order_nums, chunk_size) if store_order_nums else {}
+
+    def lookup_status(store_order_num):
+        key = str(store_order_num)
+        if key not in status_map:
+            raise KeyError(f"{store_order_num} 주문 상태 조회 결과 없음")
+        metrics.count_status(status_map[key].get('status'))
+        return status_map[key]
+
+    # 3. 조회 결과로 주문별 완료 여부 판단
+    for order, filtered_orders in order_rows:
+        try:
             is_all_complete = False
             order_cnt = len(filtered_orders)
             if order_cnt == 1:
                 complete_cnt = 0
                 store_order_num = filtered_orders.iloc[0]['스토어주문번호']
                 market_order_sheet_num = filtered_orders.iloc[0]['마켓주문번호']
-                response = store_api.get_order_status(store_order_num)
+                response = lookup_status(store_order_num)
                 order["market_order_num"] = market_order_sheet_num
                 if response.get('status') == 'Completed':
                     complete_cnt += 1
-                    print()
-                    print('완료된 주문')
-                    print(f"{store_order_num} - {market_order_sheet_num}", response.get("status"))
-                    print()
+                    log_order('완료된 주문', market_order_sheet_num, store_order_num, response.get('status'))
                 elif response.get('status') == 'Partial' or response.get('status') == 'Canceled':
-                    manual_order = shipping_orders[shipping_orders['마켓주문번호'] == order['market_order_num']]
+                    df_manual_order = order_index.find_rows(market_order_sheet_num)
+                    manual_order = df_manual_order.values.tolist()[0]
+                    manual_order.append(response.get('status'))
                     manual_process_orders.append(manual_order)
-                    print()
-                    print('수동처리가 필요한 주문')
-                    print(f"{store_order_num} - {market_order_sheet_num}", response.get("status"))
-                    print()
+                    log_order('수동처리가 필요한 주문', market_order_sheet_num, store_order_num, response.get('status'))
                 else:
-                    print()
-                    print('완료되지 않은 주문')
-                    print(f"{store_order_num} - {market_order_sheet_num}", response.get("status"))
-                    print()
+                    pending_cnt += 1
+                    log_order('완료되지 않은 주문', market_order_sheet_num, store_order_num, response.get('status'))
             else:
                 complete_cnt = 0
                 for i in range(order_cnt):
                     store_order_num = filtered_orders.iloc[i]['스토어주문번호']
                     market_order_sheet_num = filtered_orders.iloc[i]['마켓주문번호']
-                    response = store_api.get_order_status(store_order_num)
+                    response = lookup_status(store_order_num)
                     # order["market_order_num"] = market_order_sheet_num
                     if response.get('status') == 'Completed':
                         complete_cnt += 1
-                        print()
-                        print('완료된 주문')
-                        print(f"{store_order_num} - {market_order_sheet_num}", response.get("status"))
-                        print()
+                        log_order('완료된 주문', market_order_sheet_num, store_order_num, response.get('status'))
                     elif response.get('status') == 'Partial' or response.get('status') == 'Canceled':
-                        df_manual_order = shipping_orders[shipping_orders['마켓주문번호'] == market_order_sheet_num]
+                        df_manual_order = order_index.find_rows(market_order_sheet_num)
                         manual_order = df_manual_order.values.tolist()[0]
                         manual_order.append(response.get('status'))
-                        print('manual_order', manual_order)
                         manual_process_orders.append(manual_order)
-                        print()
-                        print('수동처리가 필요한 주문')
-                        print(f"{store_order_num} - {market_order_sheet_num}", response.get("status"))
-                        print()
+                        log_order('수동처리가 필요한 주문', market_order_sheet_num, store_order_num, response.get('status'))
                     else:
-                        print()
-                        print('완료되지 않은 주문')
-                        print(f"{store_order_num} - {market_order_sheet_num}", response.get("status"))
-                        print()
+                        pending_cnt += 1
+                        log_order('완료되지 않은 주문', market_order_sheet_num, store_order_num, response.get('status'))
 
             if complete_cnt == order_cnt:
                 is_all_complete = True
             
             if is_all_complete:
+                # 상태를 결정한 시트 행 (마켓주문번호 셀, 스토어주문번호): process_orders 는 이 행만 배송완료로 바꾼다
+                order['status_rows'] = [
+                    [sheet_cell_key(cell), sheet_cell_key(store_num)]
+                    for cell, store_num in zip(filtered_orders['마켓주문번호'], filtered_orders['스토어주문번호'])
+                ]
                 processed_orders.append(order)
                 
         except Exception as e:
-            print(f"주문 처리 중 오류 발생: url, 에러: {e}")
-            traceback.print_exc()
+            logger.exception(f"주문 처리 중 오류 발생: {e}", extra={'market_order_num': order.get('market_order_num')})
         # print(order)
-    print('-------------------------------')
-    print(f"진행중인 전체 주문 수: {len(orders)}")
-    print(f"완료된 주문 수: {len(processed_orders)}")
-    print(f"수동처리 필요한 주문 수: {len(manual_process_orders)}")
-    print('-------------------------------')
+    logger.info(
+        f"진행중인 전체 주문 수: {len(orders)}, 완료된 주문 수: {len(processed_orders)}, "
+        f"수동처리 필요한 주문 수: {len(manual_process_orders)}, 완료되지 않은 스토어 주문 수: {pending_cnt}",
+        extra={'orders': len(orders), 'processed': len(processed_orders),
+               'manual': len(manual_process_orders), 'pending': pending_cnt}
+    )
+    if stats is not None:
+        stats['pending'] = pending_cnt
     return [processed_orders, manual_process_orders]
 
-def process_orders(shipping_order_sheets, orders):
+@backoff.on_exception(
+    backoff.expo,
+    (APIError, TransportError, requests.exceptions.RequestException),
+    max_tries=5,
+    # 4xx 는 다시 보내도 같은 결과 (429 는 RateLimitedHTTPClient 가 이미 재시도), 5xx 와 네트워크 오류만 재시도
+    giveup=lambda e: isinstance(e, APIError) and 400 <= e.response.status_code < 500,
+    on_backoff=lambda details: metrics.incr('sheet_retries')
+)
+def write_cells(worksheet, updates):
+    # updates: [(row, col, value)] -> values.batchUpdate 한 번으로 기록
+    worksheet.batch_update([
+        {'range': rowcol_to_a1(row, col), 'values': [[value]]}
+        for row, col, value in updates
+    ])
+
+
+# 시트 셀 값 비교용 키: get_all_records 로 읽은 값(numericise 됨)과 get_all_values 원본 문자열이 같은 키가 되도록
+# 원본 문자열에 get_all_records 와 같은 gspread numericise 를 적용 (예: ' 00123' 과 123 -> '123')
+def sheet_cell_key(value):
+    return str(numericise(value) if isinstance(value, str) else value)
+
+# 주문별로 배송완료로 바꿀 배송중 행 번호를 계획 -> (주문상태 열 번호, [(주문, [행 번호])], 전체 행 번호)
+# check_order 와 같은 MarketOrderIndex 조회로 행을 찾고, check_order 가 남긴 status_rows(상태를 결정한 행)만 고른다
+# sheet_row_nums 를 주면 values[1:] 각 행의 시트 행 번호로 사용 (일부 행만 넘길 때)
+def plan_order_rows(values, orders, sheet_row_nums=None):
+    header = values[0]
+    status_idx = header.index('주문상태')
+    sheet_row_nums = list(sheet_row_nums or range(2, len(values) + 1))
+    index = MarketOrderIndex(build_sheet_frame(values, columns=['마켓주문번호', '스토어주문번호', '주문상태']))
+
+    planned_rows = set()
+    order_plans = []
+    for order in orders:
+        # check_order 가 조회에 쓴 값은 바뀌기 전의 Cafe24 주문번호
+        lookup_num = order.get('cafe24_order_num') or order.get('market_order_num')
+        decided = order.get('status_rows')
+        decided = None if decided is None else {tuple(sheet_cell_key(value) for value in row) for row in decided}
+        row_nums = []
+        for pos in index.find_shipping_positions(lookup_num):
+            row_num = sheet_row_nums[pos]
+            key = (sheet_cell_key(index.df.iat[pos, 0]), sheet_cell_key(index.df.iat[pos, 1]))
+            if row_num in planned_rows or (decided is not None and key not in decided):
+                continue
+            row_nums.append(row_num)
+            planned_rows.add(row_num)
+        order_plans.append((order, row_nums))
+    return status_idx + 1, order_plans, planned_rows
+
+@metrics.timed('process_orders')
+def process_orders(shipping_order_sheets, orders, chunk_size=None):
+    chunk_size = chunk_size or sheet_write_chunk_size
+    result = [False, []]
+
     try:
-        cell = shipping_order_sheets.find('주문상태')
-        status_col = cell.col
-        
-        cnt = 0
-        result = [False, orders]
-        
-        for order in orders:
-            data = shipping_order_sheets.get_all_records()  # 매 주문마다 최신 데이터 조회
+        # 시트는 한 번만 읽고 메모리에서 변경할 행을 계획
+        values = shipping_order_sheets.get_all_values()
+        recorder.record('shipping_values', values)
+        status_col, order_plans, planned_rows = plan_order_rows(values, orders)
+
+        # 배송완료 셀을 chunk 단위로 일괄 기록
+        updates = sorted(planned_rows)
+        written_rows = set()
+        for start in range(0, len(updates), chunk_size):
+            chunk = updates[start:start + chunk_size]
+            try:
+                write_cells(shipping_order_sheets, [(row_num, status_col, '배송완료') for row_num in chunk])
+                written_rows.update(chunk)
+            except Exception as e:
+                logger.warning(f"{chunk[0]}~{chunk[-1]}행 일괄 업데이트 실패: {e}")
+
+        # 모든 행이 기록된 주문만 Cafe24 체크 대상으로 반환 (배송중 행을 찾지 못한 주문은 제외)
+        written_orders = []
+        for order, row_nums in order_plans:
             market_order_num = order.get('market_order_num')
-            
-            # 한 번에 하나의 행만 업데이트
-            for idx, row in enumerate(data):
-                if (row['주문상태'] == '배송중' and 
-                    market_order_num in row['마켓주문번호']):
-                    row_num = idx + 2
-                    
-                    try:
-                        # batch_update 대신 개별 업데이트
-                        shipping_order_sheets.update_cell(row_num, status_col, '배송완료')
-                        print(f"{market_order_num} - {row_num}행 배송완료로 변경 성공")
-                        cnt += 1
-                        time.sleep(0.5)  # API 요청 제한 고려
-                    except Exception as e:
-                        print(f"{row_num}행 업데이트 실패: {e}")
-                        continue
-            
-            order["check_element"].click()
-            time.sleep(1)
+            if not row_nums:
+                log_order('배송중 행을 찾지 못해 배송완료 처리 제외', market_order_num, level=logging.WARNING)
+            elif all(row_num in written_rows for row_num in row_nums):
+                log_order(f"{row_nums}행 배송완료로 변경 성공", market_order_num)
+                written_orders.append(order)
+            else:
+                log_order(f"{row_nums}행 배송완료 변경 실패", market_order_num, level=logging.WARNING)
 
-        if cnt > 0:
-            result = [True, orders]
+        result = [len(written_rows) > 0, written_orders]
+        logger.info(f"배송완료 변경 {len(written_rows)}/{len(planned_rows)}행, 주문 {len(written_orders)}/{len(orders)}건",
+                    extra={'rows_written': len(written_rows), 'orders_written': len(written_orders)})
         return result
 
     except Exception as e:
-        print(f"오류 발생: {e}")
-        traceback.print_exc()
+        logger.exception(f"오류 발생: {e}")
         return result
 
+@metrics.timed('process_eship')
 def process_eship(driver, orders, order_element, alert, wait):
-    if orders[0]:
+    if not orders[0]:
+        return
+
+    # 주문이 있던 페이지별로 체크 후 배송완료 처리
+    # 뒤 페이지부터 처리해야 앞 페이지의 주문 위치가 바뀌지 않는다
+    pages = {}
+    for order in orders[1]:
+        pages.setdefault((order.get('page_key') or (0, 0), order.get('page_url')), []).append(order)
+
+    for (page_key, page_url), page_orders in sorted(pages.items(), key=lambda item: item[0][0], reverse=True):
+        if page_url:
+            driver.get(page_url)
+            wait.until(ORDER_LIST_LOADED)
+            order_element = driver.find_element(By.CSS_SELECTOR, "#eShippedEndBtn")
+
+        selected, missing, unexpected = select_orders(driver, page_orders)
+        if unexpected or not selected:
+            logger.warning('선택된 주문이 예상과 달라 배송완료 처리를 건너뜁니다.')
+            continue
+
         driver.execute_script("arguments[0].click();", order_element)
         alert = wait.until(EC.alert_is_present())
         alert.accept()
@@ -497,63 +2074,873 @@ def process_eship(driver, orders, order_element, alert, wait):
         alert.accept()
     return
 
-async def main(logger=None, send_alert=None):
-
-    try:
-        driver = init_driver()
-        wait = WebDriverWait(driver, timeout=20)
-        alert = Alert(driver)
-
-        sheet_manager = GoogleSheetManager()
-        # service_worksheets = sheet_manager.get_worksheet('market_service_list')
-        shipping_order_worksheets = sheet_manager.get_worksheet('market_store_order_list')
-        manual_order_worksheets = sheet_manager.get_worksheet('manual_order_list')
+ORDER_STORE_SHEETS = ('market_store_order_list', 'manual_order_list')
+
+class LocalOrderStore:
+    """market_store_order_list / manual_order_list 의 로컬 SQLite 사본
+
+    사이클은 사본에서 읽고 쓰며, 바뀐 셀(pending_updates)과 추가 행(pending_appends)은 push 로 시트에 반영한다.
+    push/pull 때 시트의 현재 값이 로컬에서 바꾸기 전 값(base)과 다르면 외부에서 고친 것으로 보고 시트 값을 따른다.
+    """
+
+    def __init__(self, sheet_manager, path=None):
+        self.sheet_manager = sheet_manager
+        self.path = path or os.path.join(sheet_manager.config.state_dir, 'order_store.sqlite3')
+        self.conn = None
+        self.lock = threading.RLock()
+        # push 와 pull 이 겹치면 push 전에 읽은 시트 값으로 로컬 변경을 덮어쓸 수 있어 순서대로 실행
+        self.sync_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.sync_thread = None
+
+    def connect(self):
+        if self.conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self.conn = sqlite3.connect(self.path, check_same_thread=False)
+            self.conn.executescript(
+                "CREATE TABLE IF NOT EXISTS sheet_meta ("
+                "sheet TEXT PRIMARY KEY, header TEXT NOT NULL, pulled_at REAL NOT NULL);"
+                "CREATE TABLE IF NOT EXISTS sheet_rows ("
+                "sheet TEXT NOT NULL, row_num INTEGER NOT NULL, market_order_num TEXT, store_order_num TEXT, "
+                "status TEXT, data TEXT NOT NULL, PRIMARY KEY (sheet, row_num));"
+                "CREATE INDEX IF NOT EXISTS idx_sheet_rows_market ON sheet_rows (sheet, market_order_num);"
+                "CREATE INDEX IF NOT EXISTS idx_sheet_rows_store ON sheet_rows (sheet, store_order_num);"
+                "CREATE INDEX IF NOT EXISTS idx_sheet_rows_status ON sheet_rows (sheet, status);"
+                "CREATE TABLE IF NOT EXISTS pending_updates ("
+                "sheet TEXT NOT NULL, row_num INTEGER NOT NULL, col INTEGER NOT NULL, row_key TEXT, store_key TEXT, "
+                "base TEXT, value TEXT NOT NULL, created_at REAL NOT NULL, PRIMARY KEY (sheet, row_num, col));"
+                "CREATE TABLE IF NOT EXISTS pending_appends ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, sheet TEXT NOT NULL, data TEXT NOT NULL, created_at REAL NOT NULL);"
+            )
+            # 스토어주문번호(store_key) 없이 만들어진 이전 사본
+            columns = {row[1] for row in self.conn.execute("PRAGMA table_info(pending_updates)")}
+            if 'store_key' not in columns:
+                self.conn.execute("ALTER TABLE pending_updates ADD COLUMN store_key TEXT")
+        return self.conn
+
+    def close(self):
+        self.stop_event.set()
+        if self.sync_thread is not None:
+            self.sync_thread.join(timeout=30)
+            self.sync_thread = None
+        try:
+            self.push()
+        except Exception as e:
+            logger.warning(f"종료 전 시트 반영 실패: {e}")
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+    def header(self, sheet_name):
+        with self.lock:
+            row = self.connect().execute("SELECT header FROM sheet_meta WHERE sheet = ?", (sheet_name,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def pulled_at(self, sheet_name):
+        with self.lock:
+            row = self.connect().execute("SELECT pulled_at FROM sheet_meta WHERE sheet = ?", (sheet_name,)).fetchone()
+        return row[0] if row else 0
+
+    # 색인용 열: 마켓주문번호, 스토어주문번호, 상태(수동주문 시트는 처리상태)
+    @staticmethod
+    def key_columns(header):
+        status_col = '주문상태' if '주문상태' in header else '처리상태'
+        return [header.index(col) if col in header else None for col in ('마켓주문번호', '스토어주문번호', status_col)]
+
+    @staticmethod
+    def row_keys(key_idx, row):
+        return [row[idx] if idx is not None and idx < len(row) else None for idx in key_idx]
+
+    # 같은 주문인지: (마켓주문번호, 스토어주문번호), 스토어주문번호가 기록되지 않은 변경은 마켓주문번호만 비교
+    def is_same_order(self, key_idx, row, row_key, store_key):
+        market, store, _ = self.row_keys(key_idx, row)
+        return market == row_key and (store_key is None or store == store_key)
+
+    # 대기 중인 변경이 가리키는 시트 행을 찾는다 -> {(행 번호, 열): 현재 행 번호 또는 None}
+    # 위에 행이 추가/삭제되어 주문이 다른 행으로 옮겨갔으면 같은 주문이 있는 유일한 행으로 다시 연결
+    def relocate(self, key_idx, pending, rows, find_rows):
+        targets = {}
+        for row_num, col, row_key, store_key, *_ in pending:
+            row = rows.get(row_num)
+            if row is not None and self.is_same_order(key_idx, row, row_key, store_key):
+                targets[(row_num, col)] = row_num
+            else:
+                found = find_rows(row_key, store_key)
+                targets[(row_num, col)] = found[0] if len(found) == 1 else None
+        return targets
+
+    # 시트 현재 값으로 대기 중인 변경 처리 방법 결정
+    @staticmethod
+    def classify(base, value, current):
+        if current == value:
+            return 'done'
+        if current != base:
+            return 'conflict'
+        return 'write'
+
+    @staticmethod
+    def key_lookup(rows_by_key, rows_by_market):
+        def find_rows(row_key, store_key):
+            if store_key is None:
+                return rows_by_market.get(row_key, [])
+            return rows_by_key.get((row_key, store_key), [])
+        return find_rows
+
+    def index_keys(self, key_idx, rows):
+        rows_by_key = {}
+        rows_by_market = {}
+        for row_num, row in rows.items():
+            market, store, _ = self.row_keys(key_idx, row)
+            rows_by_key.setdefault((market, store), []).append(row_num)
+            rows_by_market.setdefault(market, []).append(row_num)
+        return self.key_lookup(rows_by_key, rows_by_market)
+
+    # 시트 전체를 읽어 사본을 교체 (외부 수정 반영)
+    def pull(self, sheet_name):
+        with self.sync_lock:
+            worksheet = self.sheet_manager.get_worksheet(sheet_name)
+            with metrics.timer('order_store.pull'):
+                values = worksheet.get_all_values()
+            header = values[0] if values else []
+            rows = {row_num: pad_row(row, len(header)) for row_num, row in enumerate(values[1:], start=2)}
+            key_idx = self.key_columns(header)
+
+            with self.lock:
+                conn = self.connect()
+                header_changed = self.header(sheet_name) not in (None, header)
+                pending = conn.execute(
+                    "SELECT row_num, col, row_key, store_key, base, value FROM pending_updates WHERE sheet = ?",
+                    (sheet_name,)
+                ).fetchall()
+                targets = self.relocate(key_idx, pending, rows, self.index_keys(key_idx, rows))
+                # 아직 시트에 반영하지 않은 로컬 변경은 시트 값이 그대로일 때만 유지
+                dropped = []
+                moved = []
+                for row_num, col, row_key, store_key, base, value in pending:
+                    target = targets[(row_num, col)]
+                    current = rows[target][col - 1] if target is not None and col <= len(rows[target]) else None
+                    if header_changed or target is None:
+                        self.report_conflict(sheet_name, row_num, col, row_key, value, current, '주문 행을 찾을 수 없음')
+                        dropped.append((row_num, col))
+                        continue
+                    action = self.classify(base, value, current)
+                    if action == 'conflict':
+                        self.report_conflict(sheet_name, target, col, row_key, value, current, '시트에서 수정됨')
+                    if action != 'write':
+                        dropped.append((row_num, col))
+                        continue
+                    rows[target][col - 1] = value
+                    if target != row_num:
+                        moved.append((target, row_num, col))
+
+                conn.execute("DELETE FROM sheet_rows WHERE sheet = ?", (sheet_name,))
+                conn.executemany(
+                    "INSERT INTO sheet_rows (sheet, row_num, market_order_num, store_order_num, status, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (sheet_name, row_num, *self.row_keys(key_idx, row), json.dumps(row, ensure_ascii=False))
+                        for row_num, row in rows.items()
+                    ]
+                )
+                conn.executemany(
+                    "DELETE FROM pending_updates WHERE sheet = ? AND row_num = ? AND col = ?",
+                    [(sheet_name, row_num, col) for row_num, col in dropped]
+                )
+                self.move_pending(conn, sheet_name, moved)
+                conn.execute(
+                    "INSERT OR REPLACE INTO sheet_meta (sheet, header, pulled_at) VALUES (?, ?, ?)",
+                    (sheet_name, json.dumps(header, ensure_ascii=False), time.time())
+                )
+                conn.commit()
+        logger.info(f"{sheet_name} 로컬 사본 갱신 {len(rows)}행")
+
+    # 옮겨간 주문의 대기 중인 변경을 새 행 번호로 다시 연결: moved [(새 행, 이전 행, 열)]
+    @staticmethod
+    def move_pending(conn, sheet_name, moved):
+        conn.executemany(
+            "UPDATE OR REPLACE pending_updates SET row_num = ? WHERE sheet = ? AND row_num = ? AND col = ?",
+            [(target, sheet_name, row_num, col) for target, row_num, col in moved]
+        )
+
+    # 오래된 사본만 다시 읽는다
+    def ensure_fresh(self, max_age=None):
+        max_age = order_store_pull_seconds if max_age is None else max_age
+        for sheet_name in ORDER_STORE_SHEETS:
+            if time.time() - self.pulled_at(sheet_name) > max_age:
+                self.pull(sheet_name)
+
+    # 사본(아직 반영하지 않은 추가 행 포함)으로 시트와 같은 모양의 DataFrame 생성
+    def frame(self, sheet_name, only_shipping=False):
+        with self.lock:
+            conn = self.connect()
+            header = self.header(sheet_name) or []
+            if only_shipping:
+                # (sheet, status) 색인으로 배송중 행만 읽는다
+                cursor = conn.execute(
+                    "SELECT data FROM sheet_rows WHERE sheet = ? AND status = '배송중' ORDER BY row_num", (sheet_name,)
+                )
+            else:
+                cursor = conn.execute("SELECT data FROM sheet_rows WHERE sheet = ? ORDER BY row_num", (sheet_name,))
+            rows = [json.loads(data) for (data,) in cursor]
+            rows += [
+                pad_row(json.loads(data), len(header)) for (data,) in
+                conn.execute("SELECT data FROM pending_appends WHERE sheet = ? ORDER BY id", (sheet_name,))
+            ]
+        return build_sheet_frame([header] + rows)
+
+    # 배송중 행만 색인으로 읽어 plan_order_rows 로 계획
+    def plan_order_rows(self, orders, sheet_name='market_store_order_list'):
+        with self.lock:
+            header = self.header(sheet_name)
+            rows = self.connect().execute(
+                "SELECT row_num, data FROM sheet_rows WHERE sheet = ? AND status = '배송중' ORDER BY row_num",
+                (sheet_name,)
+            ).fetchall()
+        return plan_order_rows([header] + [json.loads(data) for _, data in rows], orders, [row_num for row_num, _ in rows])
+
+    # 로컬 사본의 셀을 바꾸고 시트 반영 대기열에 넣는다: updates [(row, col, value)]
+    def update_cells(self, sheet_name, updates):
+        now = time.time()
+        with self.lock:
+            conn = self.connect()
+            key_idx = self.key_columns(self.header(sheet_name))
+            for row_num, col, value in updates:
+                found = conn.execute(
+                    "SELECT data FROM sheet_rows WHERE sheet = ? AND row_num = ?", (sheet_name, row_num)
+                ).fetchone()
+                if found is None:
+                    raise KeyError(f"{sheet_name} {row_num}행이 로컬 사본에 없음")
+                row = json.loads(found[0])
+                # base 는 처음 바꾸기 전 값으로 유지 (같은 셀을 여러 번 바꿔도 충돌 판단 기준은 그대로)
+                market, store, _ = self.row_keys(key_idx, row)
+                conn.execute(
+                    "INSERT INTO pending_updates (sheet, row_num, col, row_key, store_key, base, value, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (sheet, row_num, col) DO UPDATE SET value = excluded.value",
+                    (sheet_name, row_num, col, market, store, row[col - 1], value, now)
+                )
+                row[col - 1] = value
+                conn.execute(
+                    "UPDATE sheet_rows SET market_order_num = ?, store_order_num = ?, status = ?, data = ? "
+                    "WHERE sheet = ? AND row_num = ?",
+                    (*self.row_keys(key_idx, row), json.dumps(row, ensure_ascii=False), sheet_name, row_num)
+                )
+            conn.commit()
+
+    # 사본 행 번호별 (마켓주문번호, 스토어주문번호)
+    def order_keys(self, sheet_name, row_nums):
+        with self.lock:
+            conn = self.connect()
+            keys = {}
+            for row_num in row_nums:
+                found = conn.execute(
+                    "SELECT market_order_num, store_order_num FROM sheet_rows WHERE sheet = ? AND row_num = ?",
+                    (sheet_name, row_num)
+                ).fetchone()
+                keys[row_num] = tuple(found) if found else (None, None)
+        return keys
+
+    def append_rows(self, sheet_name, rows):
+        now = time.time()
+        with self.lock:
+            conn = self.connect()
+            conn.executemany(
+                "INSERT INTO pending_appends (sheet, data, created_at) VALUES (?, ?, ?)",
+                [(sheet_name, json.dumps(row, ensure_ascii=False), now) for row in rows]
+            )
+            conn.commit()
+
+    def report_conflict(self, sheet_name, row_num, col, row_key, value, current, reason):
+        metrics.incr('sheet_conflicts')
+        logger.warning(
+            f"{sheet_name} {row_num}행 {col}열 충돌 ({reason}): 로컬 {value!r}, 시트 {current!r} -> 시트 값 유지",
+            extra={'market_order_num': row_key}
+        )
+
+    # 대기 중인 셀 변경과 추가 행을 시트에 반영, 반영한 건수를 반환
+    def push(self):
+        pushed = 0
+        with self.sync_lock:
+            for sheet_name in ORDER_STORE_SHEETS:
+                pushed += len(self.push_updates(sheet_name))
+                pushed += self.push_appends(sheet_name)
+        return pushed
+
+    # 시트에서 행 번호 목록의 현재 값을 읽는다 -> {행 번호: 행}
+    @staticmethod
+    def read_rows(worksheet, header, row_nums):
+        last_col = re.sub(r'\d+', '', rowcol_to_a1(1, len(header)))
+        groups = group_consecutive(sorted(row_nums))
+        results = []
+        for start in range(0, len(groups), 100):
+            results.extend(worksheet.batch_get([f"A{first}:{last_col}{last}" for first, last in groups[start:start + 100]]))
+        rows = {}
+        for (first, last), values in zip(groups, results):
+            for offset, row_num in enumerate(range(first, last + 1)):
+                rows[row_num] = pad_row(values[offset] if offset < len(values) else [], len(header))
+        return rows
+
+    # 시트의 마켓주문번호/스토어주문번호 열만 읽어 주문별 행 번호 조회 함수를 만든다
+    def read_key_lookup(self, worksheet, key_idx):
+        key_cols = [idx for idx in key_idx[:2] if idx is not None]
+        ranges = [f"{col}2:{col}" for col in (re.sub(r'\d+', '', rowcol_to_a1(1, idx + 1)) for idx in key_cols)]
+        values = iter(worksheet.batch_get(ranges))
+        markets, stores = [
+            [row[0] if row else '' for row in next(values)] if idx is not None else []
+            for idx in key_idx[:2]
+        ]
+        rows_by_key = {}
+        rows_by_market = {}
+        for offset, market in enumerate(markets):
+            store = stores[offset] if offset < len(stores) else ''
+            rows_by_key.setdefault((market, store), []).append(offset + 2)
+            rows_by_market.setdefault(market, []).append(offset + 2)
+        return self.key_lookup(rows_by_key, rows_by_market)
+
+    # 대기 중인 셀 변경을 시트에 반영하고, 시트에서 확인된 변경을 {(마켓주문번호, 스토어주문번호, 열, 값)} 으로 반환
+    # 호출하는 쪽이 sync_lock 을 잡고 있어야 한다
+    def push_updates(self, sheet_name):
+        with self.lock:
+            conn = self.connect()
+            header = self.header(sheet_name)
+            pending = conn.execute(
+                "SELECT row_num, col, row_key, store_key, base, value FROM pending_updates "
+                "WHERE sheet = ? ORDER BY row_num, col",
+                (sheet_name,)
+            ).fetchall()
+        if not pending:
+            return set()
+
+        # 바꿀 행만 다시 읽어 그동안 시트에서 바뀐 셀이나 옮겨간 행이 있는지 확인
+        worksheet = self.sheet_manager.get_worksheet(sheet_name)
+        key_idx = self.key_columns(header)
+        with metrics.timer('order_store.push'):
+            rows = self.read_rows(worksheet, header, {row_num for row_num, *_ in pending})
+            if any(not self.is_same_order(key_idx, rows[row_num], row_key, store_key)
+                   for row_num, col, row_key, store_key, *_ in pending):
+                targets = self.relocate(key_idx, pending, rows, self.read_key_lookup(worksheet, key_idx))
+                missing = {target for target in targets.values() if target is not None and target not in rows}
+                if missing:
+                    rows.update(self.read_rows(worksheet, header, missing))
+            else:
+                targets = {(row_num, col): row_num for row_num, col, *_ in pending}
+
+        writes = []
+        done = []
+        conflicts = []
+        moved = []
+        for row_num, col, row_key, store_key, base, value in pending:
+            target = targets[(row_num, col)]
+            item = (row_num, col, row_key, store_key, value)
+            if target is None:
+                self.report_conflict(sheet_name, row_num, col, row_key, value, None, '주문 행을 찾을 수 없음')
+                conflicts.append((item, None, None))
+                continue
+            if target != row_num:
+                moved.append((target, row_num, col))
+            current = rows[target][col - 1]
+            action = self.classify(base, value, current)
+            if action == 'done':
+                done.append(item)
+            elif action == 'conflict':
+                self.report_conflict(sheet_name, target, col, row_key, value, current, '시트에서 수정됨')
+                conflicts.append((item, target, current))
+            else:
+                writes.append((target, item))
 
-        # service_sheet_data = sheet_manager.get_sheet_data('market_service_list')
+        for start in range(0, len(writes), sheet_write_chunk_size):
+            chunk = writes[start:start + sheet_write_chunk_size]
+            try:
+                write_cells(worksheet, [(target, item[1], item[4]) for target, item in chunk])
+                done.extend(item for _, item in chunk)
+            except Exception as e:
+                logger.warning(f"{sheet_name} {chunk[0][0]}~{chunk[-1][0]}행 반영 실패, 다음 동기화에 재시도: {e}")
+
+        with self.lock:
+            conn = self.connect()
+            # 그사이 같은 셀을 다시 바꾼 경우(value 가 다름)는 대기열에 남긴다
+            conn.executemany(
+                "DELETE FROM pending_updates WHERE sheet = ? AND row_num = ? AND col = ? AND value = ?",
+                [(sheet_name, row_num, col, value) for row_num, col, _, _, value in done + [c[0] for c in conflicts]]
+            )
+            # 반영하지 못한 변경은 주문이 옮겨간 행 번호로 다시 연결해 다음 동기화에 재시도
+            self.move_pending(conn, sheet_name, moved)
+            for (row_num, col, _, _, _), target, current in conflicts:
+                if target is None or target != row_num:
+                    continue
+                # 충돌한 셀은 로컬 사본도 시트 값으로 되돌린다
+                found = conn.execute(
+                    "SELECT data FROM sheet_rows WHERE sheet = ? AND row_num = ?", (sheet_name, row_num)
+                ).fetchone()
+                row = json.loads(found[0])
+                row[col - 1] = current
+                conn.execute(
+                    "UPDATE sheet_rows SET market_order_num = ?, store_order_num = ?, status = ?, data = ? "
+                    "WHERE sheet = ? AND row_num = ?",
+                    (*self.row_keys(key_idx, row), json.dumps(row, ensure_ascii=False), sheet_name, row_num)
+                )
+            if moved or any(target is None for _, target, _ in conflicts):
+                # 행 위치가 바뀌었으므로 다음 동기화에서 사본 전체를 다시 받는다
+                conn.execute("UPDATE sheet_meta SET pulled_at = 0 WHERE sheet = ?", (sheet_name,))
+            conn.commit()
+        self.sheet_manager.invalidate(sheet_name)
+        logger.info(f"{sheet_name} 셀 {len(done)}개 반영, 충돌 {len(conflicts)}개")
+        return {(row_key, store_key, col, value) for _, col, row_key, store_key, value in done}
+
+    def push_appends(self, sheet_name):
+        with self.lock:
+            pending = self.connect().execute(
+                "SELECT id, data FROM pending_appends WHERE sheet = ? ORDER BY id", (sheet_name,)
+            ).fetchall()
+        if not pending:
+            return 0
+
+        worksheet = self.sheet_manager.get_worksheet(sheet_name)
+        with metrics.timer('order_store.push'):
+            worksheet.append_rows([json.loads(data) for _, data in pending])
+        with self.lock:
+            conn = self.connect()
+            conn.execute("DELETE FROM pending_appends WHERE sheet = ? AND id <= ?", (sheet_name, pending[-1][0]))
+            # 추가된 행의 시트 행 번호는 다음 pull 에서 받는다
+            conn.execute("UPDATE sheet_meta SET pulled_at = 0 WHERE sheet = ?", (sheet_name,))
+            conn.commit()
+        self.sheet_manager.invalidate(sheet_name)
+        logger.info(f"{sheet_name} 행 {len(pending)}개 추가 반영")
+        return len(pending)
+
+    # push 후 오래된 사본은 pull
+    def sync(self):
+        try:
+            self.push()
+            self.ensure_fresh()
+        except Exception as e:
+            logger.warning(f"로컬 주문 사본 동기화 실패: {e}")
+
+    def start_sync(self, interval=None):
+        if self.sync_thread is not None and self.sync_thread.is_alive():
+            return
+        interval = interval or order_store_sync_seconds
+        self.stop_event.clear()
+
+        def loop():
+            while not self.stop_event.wait(interval):
+                self.sync()
+
+        self.sync_thread = threading.Thread(target=loop, name=f"order-store-sync-{self.sheet_manager.config.name}", daemon=True)
+        self.sync_thread.start()
+
+
+_order_stores = {}
+
+# 몰마다 상태 디렉터리에 하나의 LocalOrderStore
+def get_order_store(config=None):
+    config = config or MallConfig.from_env()
+    if config.name not in _order_stores:
+        _order_stores[config.name] = LocalOrderStore(get_sheet_manager(config))
+    return _order_stores[config.name]
+
+# 동기화 스레드를 멈추고 남은 변경을 시트에 반영
+def close_order_stores():
+    for store in list(_order_stores.values()):
+        store.close()
+    _order_stores.clear()
+
+# process_orders 의 로컬 사본 버전: 배송중 행만 색인으로 찾아 사본에 기록한 뒤 바로 시트에 반영
+# process_orders 와 같이 시트 반영이 확인된 주문만 Cafe24 체크 대상으로 반환
+@metrics.timed('process_orders')
+def process_orders_local(order_store, orders):
+    sheet_name = 'market_store_order_list'
+    # 백그라운드 동기화가 사이에 끼어 반영 결과를 가져가지 않도록 기록과 반영을 한 번에
+    with order_store.sync_lock:
+        status_col, order_plans, planned_rows = order_store.plan_order_rows(orders)
+        order_keys = order_store.order_keys(sheet_name, planned_rows)
+        order_store.update_cells(sheet_name, [(row_num, status_col, '배송완료') for row_num in sorted(planned_rows)])
+        try:
+            confirmed = order_store.push_updates(sheet_name)
+        except Exception as e:
+            # 기록은 사본에 남아 있으므로 다음 동기화에서 다시 반영된다
+            logger.warning(f"{sheet_name} 반영 실패, 다음 동기화에 재시도: {e}")
+            confirmed = set()
+
+    written_rows = {row_num for row_num in planned_rows if (*order_keys[row_num], status_col, '배송완료') in confirmed}
+    written_orders = []
+    for order, row_nums in order_plans:
+        market_order_num = order.get('market_order_num')
+        if not row_nums:
+            log_order('배송중 행을 찾지 못해 배송완료 처리 제외', market_order_num, level=logging.WARNING)
+        elif all(row_num in written_rows for row_num in row_nums):
+            log_order(f"{row_nums}행 배송완료로 변경 성공", market_order_num)
+            written_orders.append(order)
+        else:
+            log_order(f"{row_nums}행 배송완료 변경 실패", market_order_num, level=logging.WARNING)
+    logger.info(f"배송완료 변경 {len(written_rows)}/{len(planned_rows)}행, 주문 {len(written_orders)}/{len(orders)}건",
+                extra={'rows_written': len(written_rows), 'orders_written': len(written_orders)})
+    return [len(written_rows) > 0, written_orders]
+
+# 시트 단계: 연결, 워크시트, 주문 시트 다운로드와 인덱스 생성 (작업 스레드에서 실행)
+def load_order_sheets(config):
+    sheet_manager = get_sheet_manager(config)
+    # service_worksheets = sheet_manager.get_worksheet('market_service_list')
+    shipping_order_worksheets = sheet_manager.get_worksheet('market_store_order_list')
+    manual_order_worksheets = sheet_manager.get_worksheet('manual_order_list')
+
+    # service_sheet_data = sheet_manager.get_sheet_data('market_service_list')
+    if order_store_enabled:
+        # 시트 대신 로컬 사본에서 읽는다 (오래된 사본만 시트에서 다시 받아옴)
+        order_store = get_order_store(config)
+        order_store.ensure_fresh()
+        order_store.start_sync()
+        shipping_order_data = order_store.frame('market_store_order_list', only_shipping=sheet_lean_load)
+    elif sheet_incremental_read:
+        shipping_order_data = sheet_manager.get_sheet_data_incremental('market_store_order_list')
+    elif sheet_lean_load:
+        # 수동주문 행 전체가 필요하므로 컬럼은 모두 유지하고 배송중 행만 읽는다
+        shipping_order_data = sheet_manager.get_sheet_frame('market_store_order_list', only_shipping=True)
+    else:
         shipping_order_data = sheet_manager.get_sheet_data('market_store_order_list')
-        # manual_order_sheet_data = sheet_manager.get_sheet_data('manual_order_list')
-
-        store_api = StoreAPI(store_api_key)
-
-        cafe24_login(driver, login_page, wait)
-        order_list = scrape_orders(driver, shipping_page, wait)
-        orders, shipping_complete_element = order_list
-
-        check_orders = await check_order(orders, shipping_order_data, store_api)
-
-        processed_orders, manual_orders = check_orders
-        print('-------------------------------')
-        print('완료된 주문목록', processed_orders)
-        print('-------------------------------')
-        if len(manual_orders) > 0:
-            process_manual_order(manual_order_worksheets, manual_orders, make_hook_url, sheet_manager)
-        if len(processed_orders) > 0:
+    # manual_order_sheet_data = sheet_manager.get_sheet_data('manual_order_list')
+    order_index = MarketOrderIndex(shipping_order_data)
+    return sheet_manager, shipping_order_worksheets, manual_order_worksheets, order_index
+
+# 브라우저 단계: 로그인된 브라우저를 받아 배송중 주문 크롤링 (작업 스레드에서 실행)
+# 체크포인트의 주문(orders)을 주면 다시 크롤링하지 않고 배송완료 버튼만 찾는다
+def load_shipping_orders(config, orders=None):
+    # 로그인된 브라우저를 매니저에서 받아온다
+    driver = get_driver_manager(config).acquire()
+    wait = WebDriverWait(driver, timeout=20)
+    if orders is not None:
+        timed_get(driver, config.shipping_page, '배송중 목록')
+        wait.until(ORDER_LIST_LOADED)
+        return driver, orders, driver.find_element(By.CSS_SELECTOR, "#eShippedEndBtn")
+    orders, shipping_complete_element = scrape_orders(driver, config.shipping_page, wait)
+    return driver, orders, shipping_complete_element
+
+# 시트 배송완료 기록 후 Cafe24 배송완료 처리
+# journal 이 있으면 시트 기록 결과와 Cafe24 처리 완료를 단계별로 남기고, 이미 기록된 시트 단계는 건너뛴다
+def complete_orders(driver, sheet_manager, shipping_order_worksheets, processed_orders, shipping_complete_element, journal=None):
+    wait = WebDriverWait(driver, timeout=20)
+    alert = Alert(driver)
+    check_orders = journal.get('sheet_written') if journal else None
+    if check_orders is None:
+        if order_store_enabled:
+            check_orders = process_orders_local(get_order_store(sheet_manager.config), processed_orders)
+        else:
             check_orders = process_orders(shipping_order_worksheets, processed_orders)
-            process_eship(driver, check_orders, shipping_complete_element, alert, wait)
+            sheet_manager.invalidate('market_store_order_list')
+        if journal:
+            journal.commit('sheet_written', check_orders)
+    process_eship(driver, check_orders, shipping_complete_element, alert, wait)
+    if journal:
+        journal.commit('eship')
+    # 시트 기록에 실패한 주문 수
+    return len(processed_orders) - len(check_orders[1])
+
+CYCLE_JOURNAL_FILE = 'cycle_journal.json'
+
+class CycleJournal:
+    """사이클 단계별 결과를 state_dir 에 남겨 실패 후 재시도가 끝난 단계를 건너뛰게 한다
+
+    단계: scraped(크롤링 주문) -> checked(완료/수동처리 주문) -> manual(수동주문 처리)
+          -> sheet_written(시트 배송완료 기록) -> eship(Cafe24 배송완료 처리)
+    """
+
+    def __init__(self, state_dir, ttl=None):
+        self.path = os.path.join(state_dir, CYCLE_JOURNAL_FILE)
+        self.ttl = cycle_journal_ttl if ttl is None else ttl
+        self.started_at = time.time()
+        self.stages = {}
+        self.lock = threading.Lock()
+
+    # 만료되지 않은 이전(실패한) 사이클의 기록이 있으면 이어받는다
+    def load(self):
+        if not os.path.exists(self.path):
+            return self
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.warning(f"체크포인트 로드 실패: {e}")
+            return self
+        if time.time() - data.get('started_at', 0) > self.ttl:
+            logger.info('오래된 체크포인트를 버리고 새 사이클을 시작합니다.')
+            self.clear()
+            return self
+
+        self.started_at = data['started_at']
+        self.stages = data.get('stages', {})
+        # JSON 에서 list 로 바뀐 page_key 를 process_eship 이 쓰는 tuple 로 되돌린다
+        checked = self.stages.get('checked') or {}
+        sheet_written = self.stages.get('sheet_written') or [False, []]
+        for order in (self.stages.get('scraped') or []) + checked.get('processed', []) + sheet_written[1]:
+            if order.get('page_key') is not None:
+                order['page_key'] = tuple(order['page_key'])
+        if self.stages:
+            logger.info(f"체크포인트에서 재개: 완료된 단계 {list(self.stages)}")
+        return self
+
+    def done(self, stage):
+        return stage in self.stages
+
+    def get(self, stage):
+        return self.stages.get(stage)
+
+    # 단계 결과를 기록하고 바로 파일에 반영 (이후 단계가 값을 바꿔도 기록은 그대로)
+    def commit(self, stage, value=True):
+        with self.lock:
+            self.stages[stage] = copy.deepcopy(value)
+            try:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump({'started_at': self.started_at, 'stages': self.stages}, f, ensure_ascii=False, default=str)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                logger.warning(f"체크포인트 기록 실패 ({stage}): {e}")
+
+    # 사이클이 끝까지 성공하면 기록을 지운다
+    def clear(self):
+        with self.lock:
+            self.stages = {}
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+# 마지막 사이클 요약 (main.scheduler 가 다음 실행 간격을 정하는 데 사용)
+last_cycle_stats = {}
+
+async def main(logger=None, send_alert=None, config=None, record_dir=None, send_notice=None):
+    logger = logger or logging.getLogger(LOGGER_NAME)
+    config = config or MallConfig.from_env()
+    mall_log_filter.mall = config.name
+    status_cache = get_status_cache(config)
+    store_api = AsyncStoreAPI(config.store_api_key, cache=status_cache, base_url=config.store_basic_url)
+    status_cache.reset_stats()
+    sheets_rate_limiter.reset_stats()
+    metrics.reset()
+    recorder.reset(record_dir or cycle_record_dir or None)
+    cycle_started = time.monotonic()
+    stats = {'mall': config.name, 'failed': False, 'scraped': 0, 'processed': 0, 'manual': 0, 'pending': 0, 'failed_writes': 0}
+    last_cycle_stats.clear()
+    failed = False
+    # 이전 시도가 실패했다면 끝난 단계는 체크포인트에서 이어받는다
+    journal = CycleJournal(config.state_dir).load()
+    if journal.stages:
+        stats['resumed'] = list(journal.stages)
+
+    try:
+        scraped = journal.get('scraped')
+        checked = journal.get('checked')
+        # 브라우저는 크롤링이나 Cafe24 배송완료 처리가 남았을 때만, 시트는 상태 확인이나 시트 기록이 남았을 때만 연다
+        need_browser = scraped is None or (not journal.done('eship') and (checked is None or bool(checked['processed'])))
+        need_sheets = checked is None or (
+            (checked['manual'] and not journal.done('manual')) or
+            (checked['processed'] and not journal.done('sheet_written'))
+        )
+
+        # 브라우저(로그인, 크롤링)와 구글 시트 다운로드를 동시에 진행
+        # 한쪽이 실패해도 다른 쪽 스레드가 끝난 뒤에 브라우저를 정리하도록 둘 다 기다린다
+        browser_stage, sheet_stage = await asyncio.gather(
+            asyncio.to_thread(load_shipping_orders, config, scraped) if need_browser else asyncio.sleep(0),
+            asyncio.to_thread(load_order_sheets, config) if need_sheets else asyncio.sleep(0),
+            return_exceptions=True
+        )
+        for stage in (browser_stage, sheet_stage):
+            if isinstance(stage, Exception):
+                raise stage
+        driver, orders, shipping_complete_element = browser_stage or (None, scraped, None)
+        sheet_manager, shipping_order_worksheets, manual_order_worksheets, order_index = sheet_stage or (None, None, None, None)
+        if scraped is None:
+            journal.commit('scraped', orders)
+
+        if checked is None:
+            # check_order 가 주문을 바꾸기 전의 크롤링 결과와 시트 스냅샷
+            recorder.record('orders', orders)
+            recorder.record_frame('sheet', order_index.df)
+
+            processed_orders, manual_orders = await check_order(orders, order_index, store_api, stats=stats)
+            logger.info(f"주문 상태 캐시 hit {status_cache.hits}건 / miss {status_cache.misses}건")
+            journal.commit('checked', {'processed': processed_orders, 'manual': manual_orders, 'pending': stats['pending']})
+        else:
+            processed_orders, manual_orders = checked['processed'], checked['manual']
+            stats['pending'] = checked['pending']
+
+        stats.update(scraped=len(orders), processed=len(processed_orders), manual=len(manual_orders))
+        logger.info(f"완료된 주문목록 {len(processed_orders)}건",
+                    extra={'market_order_nums': [order.get('market_order_num') for order in processed_orders]})
+
+        def manual_stage():
+            process_manual_order(manual_order_worksheets, manual_orders, config.make_hook_url, sheet_manager)
+            journal.commit('manual')
+
+        # 수동주문 처리와 배송완료 처리는 서로 독립적이므로 동시에 진행
+        stages = {}
+        if len(manual_orders) > 0 and not journal.done('manual'):
+            stages['manual'] = asyncio.to_thread(manual_stage)
+        if len(processed_orders) > 0 and not journal.done('eship'):
+            stages['complete'] = asyncio.to_thread(
+                complete_orders, driver, sheet_manager, shipping_order_worksheets, processed_orders,
+                shipping_complete_element, journal
+            )
+        results = dict(zip(stages, await asyncio.gather(*stages.values(), return_exceptions=True)))
+        for result in results.values():
+            if isinstance(result, Exception):
+                raise result
+        if 'complete' in results:
+            stats['failed_writes'] = results['complete']
+        if order_store_enabled:
+            # 이번 사이클의 변경은 동기화 주기를 기다리지 않고 바로 반영
+            await asyncio.to_thread(get_order_store(config).sync)
+        logger.info(f"구글 시트 요청 {sheets_rate_limiter.stats()}")
+        # 사이클이 끝까지 성공했으므로 다음 사이클은 처음부터
+        journal.clear()
         return processed_orders
     except Exception as e:
+        failed = True
+        stats['failed'] = True
+        stats['error'] = str(e)
         error_msg = f"Automation Check critical error occurred: {e}"
 
-        if logger:
-            logger.error(error_msg)
-            logger.error(traceback.format_exc())
-        else:
-            print(f"Error: {e}")
-            traceback.print_exc()
+        logger.exception(error_msg, extra={'mall': config.name})
 
         if send_alert:
-            await send_alert(f"{error_msg}\n\n{traceback.format_exc()}")
+            timing = metrics.summary(time.monotonic() - cycle_started)
+            await send_alert(f"{error_msg}\n\n{timing}\n\n{traceback.format_exc()}")
             
         return []
     finally:
-        print('완료')
-        driver.quit()
+        logger.info('완료')
         # 비동기 세션 정리
+        await store_api.aclose()
+        get_driver_manager(config).release(failed=failed)
+        total_seconds = time.monotonic() - cycle_started
+        stats['seconds'] = round(total_seconds, 1)
+        metrics.write(config.name, total_seconds)
+        recorder.save(config.name, stats)
+        last_cycle_stats.update(stats)
+        # 느린 사이클은 단계별 소요 시간 요약을 에러가 아닌 일반 알림(send_notice)으로 보낸다
+        if send_notice and not failed and total_seconds > slow_cycle_seconds:
+            await send_notice(f"⏱️ 느린 사이클 ({config.name})\n{metrics.summary(total_seconds)}")
+
+
+# 작업자 프로세스 초기화: 로그는 부모 큐로, 구글 시트 할당량은 작업자 수로 나눠 사용
+def init_mall_worker(log_queue, workers):
+    global sheets_rate_limiter
+    init_worker_logging(log_queue)
+    sheets_rate_limiter = SheetsRateLimiter(sheets_quota_per_minute / workers)
+
+# 프로세스 풀 작업자: 몰 하나를 처리하고 결과 요약을 반환
+# 브라우저와 로컬 사본은 작업자 프로세스에 남겨 다음 사이클에 재사용 (정리는 close_mall_worker)
+# 실패하면 저널이 만료되기 전에 같은 작업자에서 체크포인트부터 재시도
+def run_mall(config):
+    for attempt in range(1, mall_max_attempts + 1):
+        asyncio.run(main(config=config))
+        if not last_cycle_stats.get('failed') or attempt == mall_max_attempts:
+            break
+        logger.warning(f"{config.name} 사이클 실패 ({attempt}/{mall_max_attempts}), "
+                       f"{mall_retry_delay}초 후 체크포인트에서 재시도: {last_cycle_stats.get('error')}")
+        time.sleep(mall_retry_delay)
+    return dict(last_cycle_stats)
+
+def close_mall_worker():
+    close_driver_managers()
+    close_order_stores()
+
+
+class MallPool:
+    """사이클 간에 유지하는 몰 작업자 프로세스
+
+    몰마다 항상 같은 작업자(단일 프로세스 실행기)에 배정해 브라우저와 로컬 사본을 다음 사이클에도 재사용한다.
+    작업자 하나가 몰 여러 개를 맡으면 그 몰들의 브라우저를 모두 유지하므로 MALL_WORKERS 로 조절한다.
+    """
+
+    def __init__(self, workers=None, log_queue=None):
+        self.workers = workers or mall_workers
+        self.log_queue = log_queue
+        self.executors = {}
+        self.assigned = {}
+
+    def executor_for(self, config):
+        if config.name not in self.assigned:
+            self.assigned[config.name] = len(self.assigned) % self.workers
+        idx = self.assigned[config.name]
+        if idx not in self.executors:
+            self.executors[idx] = ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_mall_worker, initargs=(self.log_queue, self.workers)
+            )
+        return self.executors[idx]
+
+    async def run(self, configs):
+        # 몰이 작업자 수보다 적으면 할당량을 몰 수로만 나눈다
+        if not self.executors:
+            self.workers = max(min(self.workers, len(configs)), 1)
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(
+            *(loop.run_in_executor(self.executor_for(config), run_mall, config) for config in configs),
+            return_exceptions=True
+        )
+        # 작업자 프로세스가 죽은 실행기는 다음 사이클에 새로 만든다
+        for config, result in zip(configs, results):
+            idx = self.assigned[config.name]
+            if isinstance(result, BrokenProcessPool) and idx in self.executors:
+                logger.warning(f"몰 작업자 {idx} 종료됨, 다음 사이클에 다시 시작")
+                self.executors.pop(idx).shutdown(wait=False)
+        return results
+
+    def close(self):
+        for executor in self.executors.values():
+            try:
+                executor.submit(close_mall_worker).result(timeout=60)
+            except Exception as e:
+                logger.warning(f"몰 작업자 정리 실패: {e}")
+            executor.shutdown(wait=True)
+        self.executors.clear()
+
+
+_mall_pool = None
+
+# 여러 몰을 작업자 프로세스에서 동시에 실행하고 몰별 결과를 모은다
+# log_queue 를 주면 작업자 로그를 그 큐(multiprocessing Queue)로 모은다, 작업자는 close_mall_pool 까지 유지
+async def run_malls(configs, workers=None, log_queue=None):
+    global _mall_pool
+    if _mall_pool is None:
+        _mall_pool = MallPool(workers, log_queue)
+    results = await _mall_pool.run(configs)
+
+    summary = []
+    for config, result in zip(configs, results):
+        if isinstance(result, Exception):
+            summary.append({'mall': config.name, 'failed': True, 'error': str(result)})
+        else:
+            summary.append(result)
+    return summary
+
+def close_mall_pool():
+    global _mall_pool
+    if _mall_pool is not None:
+        _mall_pool.close()
+        _mall_pool = None
+
+def format_mall_summary(results):
+    lines = [f"몰 {len(results)}개 실행 결과"]
+    for result in results:
+        if result.get('failed'):
+            lines.append(f"❌ {result['mall']}: {result.get('error')}")
+        else:
+            lines.append(
+                f"✅ {result['mall']}: 배송중 {result.get('scraped', 0)}, 완료 {result.get('processed', 0)}, "
+                f"수동 {result.get('manual', 0)}, 진행중 {result.get('pending', 0)}, "
+                f"시트 기록 실패 {result.get('failed_writes', 0)}, {result.get('seconds', 0)}초"
+            )
+    return '\n'.join(lines)
 
 if __name__ == "__main__":
     import asyncio
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     loop = asyncio.get_event_loop()
     try:
         orders = loop.run_until_complete(main())
     finally:
+        close_driver_managers()
+        close_order_stores()
         loop.close()
@@ -0,0 +1,492 @@
+"""automation_check.main 전체 사이클을 로컬 대역(Cafe24, 스토어 API, 구글 시트)으로 측정
+
+실행: python -m benchmarks.cycle [--sizes 10,100,1000] [--api-latency 0.05] [--sheet-latency 0.2]
+                                 [--browser fake|chrome] [--page-latency 0.3]
+
+- Cafe24: 로컬 HTTP 서버가 로그인/대시보드/배송중 목록(#searchResultList) 페이지를 제공
+- 브라우저: 기본(fake)은 FakeDriver 가 같은 서버에서 페이지를 받아 automation_check 가 쓰는 WebDriver 호출
+  (탭 열기, 행 추출 스크립트, 체크박스 선택, 배송완료 confirm/alert)을 재현한다. 렌더링 비용은 --page-latency 로 대신한다.
+  --browser chrome 은 헤드리스 Chrome 과 chromedriver 가 필요하다.
+- 스토어 API: 같은 서버의 /api 가 status(order, orders) 요청에 지연시간을 두고 응답
+- 구글 시트: 메모리 안의 가짜 gspread 워크시트
+"""
+import argparse
+import asyncio
+import html
+import json
+import os
+import re
+import socket
+import tempfile
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import urlparse, parse_qs
+from urllib.request import urlopen
+
+from gspread.utils import a1_to_rowcol
+from selenium.common.exceptions import NoAlertPresentException, NoSuchElementException
+from selenium.webdriver.common.by import By
+
+import automation_check as ac
+
+from benchmarks.sheet_loading import HEADER
+
+MANUAL_HEADER = HEADER[:9] + ['처리상태', '처리내용']
+
+LOGIN_PAGE = """<html><body>
+<input name="loginId"><input name="loginPasswd" type="password">
+<button class="btnStrong large" onclick="location.href='/password'">로그인</button>
+</body></html>"""
+
+PASSWORD_PAGE = """<html><body>
+<button id="iptBtnEm" onclick="location.href='/dashboard'">다음에 변경</button>
+</body></html>"""
+
+DASHBOARD_PAGE = "<html><body><h1>dashboard</h1></body></html>"
+
+SHIPPING_PAGE = """<html><body>
+<button id="eShippedEndBtn" onclick="if (confirm('배송완료 처리하시겠습니까?')) {{ alert('처리되었습니다.'); }}">배송완료</button>
+<table id="searchResultList">{rows}</table>
+</body></html>"""
+
+SHIPPING_ROW = """<tbody class="center"><tr>
+<td><input type="checkbox" class="chkbox" id="chk_{idx}" value="{order_num}"></td>
+<td class="orderNum">2025-01-01 12:00<br>{order_num} <a href="#">상세</a></td>
+<td>user{idx}</td><td>service-{service}</td><td>배송중</td>
+</tr></tbody>"""
+
+EMPTY_ROWS = '<tbody class="empty"><tr><td colspan="9">검색된 주문내역이 없습니다.</td></tr></tbody>'
+
+
+def market_order_num(idx):
+    return f"20250101-{idx:07d}"
+
+
+def store_order_num(idx):
+    return str(100000 + idx)
+
+
+# 주문번호로 정해지는 스토어 상태: 60% 완료, 30% 진행중, 10% 부분완료
+def store_status(order_id):
+    bucket = int(order_id) % 10
+    if bucket < 6:
+        return 'Completed'
+    if bucket < 9:
+        return 'In progress'
+    return 'Partial'
+
+
+class BenchHandler(BaseHTTPRequestHandler):
+    order_count = 0
+    api_latency = 0.0
+    page_latency = 0.0
+
+    def log_message(self, *args):
+        pass
+
+    def send_body(self, body, content_type='text/html; charset=utf-8'):
+        data = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        if parsed.path == '/login':
+            return self.send_body(LOGIN_PAGE)
+        if parsed.path == '/password':
+            return self.send_body(PASSWORD_PAGE)
+        if parsed.path == '/dashboard':
+            return self.send_body(DASHBOARD_PAGE)
+        if parsed.path == '/shipping':
+            time.sleep(self.page_latency)
+            return self.send_body(self.shipping_page(parse_qs(parsed.query)))
+        self.send_error(404)
+
+    # paged 모드의 limit/page 파라미터 지원
+    def shipping_page(self, query):
+        limit = int(query.get(ac.shipping_page_size_param, [self.order_count])[0] or self.order_count)
+        page = int(query.get(ac.shipping_page_param, ['1'])[0])
+        indexes = range(self.order_count)[(page - 1) * limit:page * limit] if limit else []
+        rows = ''.join(
+            SHIPPING_ROW.format(idx=idx, order_num=market_order_num(idx), service=idx % 50)
+            for idx in indexes
+        )
+        return SHIPPING_PAGE.format(rows=rows or EMPTY_ROWS)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length).decode('utf-8')
+        if self.path == '/hook':
+            return self.send_body('Accepted', 'text/plain')
+        if self.path != '/api':
+            return self.send_error(404)
+
+        time.sleep(self.api_latency)
+        params = parse_qs(body)
+        if 'orders' in params:
+            result = {
+                order_id: {'status': store_status(order_id), 'charge': '0', 'remains': '0'}
+                for order_id in params['orders'][0].split(',')
+            }
+        elif 'order' in params:
+            result = {'status': store_status(params['order'][0]), 'charge': '0', 'remains': '0'}
+        else:
+            result = {'error': 'Incorrect request'}
+        self.send_body(json.dumps(result), 'application/json')
+
+
+# A1 표기의 열 문자 -> 1부터 시작하는 열 번호
+def column_index(a1):
+    col = 0
+    for ch in a1:
+        if not ch.isalpha():
+            break
+        col = col * 26 + ord(ch.upper()) - ord('A') + 1
+    return col
+
+
+# FakeDriver.find_element 가 지원하는 선택자 -> 페이지 HTML 에 있어야 하는 표시
+FAKE_SELECTORS = {
+    (By.NAME, 'loginId'): 'name="loginId"',
+    (By.NAME, 'loginPasswd'): 'name="loginPasswd"',
+    (By.CSS_SELECTOR, 'button.btnStrong.large'): 'class="btnStrong large"',
+    (By.CSS_SELECTOR, '#iptBtnEm'): 'id="iptBtnEm"',
+    (By.CSS_SELECTOR, 'td.orderNum'): 'class="orderNum"',
+    (By.CSS_SELECTOR, '.chkbox'): 'class="chkbox"',
+    (By.CSS_SELECTOR, '#searchResultList tbody.empty'): 'tbody class="empty"',
+    (By.CSS_SELECTOR, '#eShippedEndBtn'): 'id="eShippedEndBtn"',
+}
+
+# 버튼 클릭 시 이동할 경로
+FAKE_NAVIGATION = {
+    'button.btnStrong.large': '/password',
+    '#iptBtnEm': '/dashboard',
+}
+
+
+def inner_text(fragment):
+    text = re.sub(r'<br\s*/?>', '\n', fragment)
+    return html.unescape(re.sub(r'<[^>]+>', '', text)).strip()
+
+
+class FakeElement:
+    def __init__(self, selector):
+        self.selector = selector
+
+    def send_keys(self, *keys):
+        pass
+
+
+class FakeAlert:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def accept(self):
+        self.driver.alerts.pop(0)
+
+
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def window(self, handle):
+        self.driver.current_window_handle = handle
+
+    @property
+    def alert(self):
+        if not self.driver.alerts:
+            raise NoAlertPresentException()
+        return FakeAlert(self.driver)
+
+
+class FakeDriver:
+    """automation_check 가 쓰는 WebDriver 호출만 흉내 내는 브라우저 대역
+
+    페이지는 BenchHandler 에서 실제 HTTP 로 받고, execute_script 는 스크립트별로
+    같은 결과(행 추출, 체크박스 선택, 클릭)를 HTML 에서 계산한다.
+    """
+
+    def __init__(self, browser_profile='fake'):
+        self.browser_profile = browser_profile
+        self.tabs = {'main': ('about:blank', '')}
+        self.current_window_handle = 'main'
+        self.opened = 0
+        self.checked = set()
+        self.alerts = []
+        self.switch_to = FakeSwitchTo(self)
+        self.service = SimpleNamespace(process=SimpleNamespace(pid=os.getpid()))
+
+    @property
+    def current_url(self):
+        return self.tabs[self.current_window_handle][0]
+
+    @property
+    def page_source(self):
+        return self.tabs[self.current_window_handle][1]
+
+    @property
+    def window_handles(self):
+        return list(self.tabs)
+
+    def load(self, url):
+        with urlopen(url) as response:
+            return url, response.read().decode('utf-8')
+
+    def get(self, url):
+        self.tabs[self.current_window_handle] = self.load(url)
+        self.checked = set()
+
+    def find_element(self, by, value):
+        marker = FAKE_SELECTORS.get((by, value))
+        if marker is None or marker not in self.page_source:
+            raise NoSuchElementException(f"{by} {value}")
+        return FakeElement(value)
+
+    def order_rows(self):
+        rows = []
+        for body in re.findall(r'<tbody class="center">(.*?)</tbody>', self.page_source, re.S):
+            cells = re.findall(r'<td([^>]*)>(.*?)</td>', body, re.S)
+            order_num = next((inner_text(text) for attrs, text in cells if 'orderNum' in attrs), None)
+            rows.append({
+                'order_num_text': order_num,
+                'has_checkbox': 'class="chkbox"' in body,
+                'cells': [inner_text(text) for _, text in cells],
+            })
+        return rows
+
+    def execute_script(self, script, *args):
+        if script == ac.SCRAPE_ORDER_ROWS_SCRIPT:
+            return self.order_rows()
+        if script == ac.SELECT_ORDERS_SCRIPT:
+            targets = set(args[0])
+            self.checked = {
+                row['order_num_text'].split('\n')[1].split(' ')[0]
+                for row in self.order_rows() if row['order_num_text'] and row['has_checkbox']
+            } & targets
+            return sorted(self.checked)
+        if script.startswith('window.open'):
+            self.opened += 1
+            self.tabs[f"tab-{self.opened}"] = ('about:blank', '')
+            return None
+        if script.startswith('window.location.href'):
+            self.get(args[0])
+            return None
+        if script == "arguments[0].click();":
+            selector = args[0].selector
+            if selector in FAKE_NAVIGATION:
+                base = urlparse(self.current_url)
+                self.get(f"{base.scheme}://{base.netloc}{FAKE_NAVIGATION[selector]}")
+            elif selector == '#eShippedEndBtn' and self.checked:
+                # confirm('배송완료 처리하시겠습니까?') 다음 alert('처리되었습니다.')
+                self.alerts = ['confirm', 'alert']
+            return None
+        if 'readyState' in script:
+            return 'complete'
+        return 1
+
+    def execute_cdp_cmd(self, cmd, params):
+        return {'cookies': []} if cmd == 'Network.getAllCookies' else {}
+
+    def close(self):
+        self.tabs.pop(self.current_window_handle, None)
+
+    def quit(self):
+        self.tabs = {}
+
+
+class FakeWorksheet:
+    """automation_check 가 사용하는 gspread.Worksheet 메서드만 메모리에서 흉내"""
+
+    def __init__(self, values, latency=0.0):
+        self.values = values
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.calls = 0
+
+    def call(self):
+        self.calls += 1
+        time.sleep(self.latency)
+
+    # 그리드 행 수 (가짜 시트는 값이 있는 행까지만)
+    @property
+    def row_count(self):
+        return len(self.values)
+
+    def row_values(self, row):
+        self.call()
+        return list(self.values[row - 1])
+
+    def get_all_values(self):
+        self.call()
+        with self.lock:
+            return [list(row) for row in self.values]
+
+    def get_all_records(self):
+        self.call()
+        with self.lock:
+            header = self.values[0]
+            return [dict(zip(header, row)) for row in self.values[1:]]
+
+    def batch_get(self, ranges):
+        self.call()
+        result = []
+        with self.lock:
+            for a1_range in ranges:
+                start, end = a1_range.split(':')
+                first = int(''.join(ch for ch in start if ch.isdigit()))
+                last = ''.join(ch for ch in end if ch.isdigit())
+                last = int(last) if last else len(self.values)
+                first_col = column_index(start)
+                last_col = column_index(end)
+                result.append([list(row[first_col - 1:last_col]) for row in self.values[first - 1:last]])
+        return result
+
+    def batch_update(self, data):
+        self.call()
+        with self.lock:
+            for item in data:
+                row, col = a1_to_rowcol(item['range'])
+                self.values[row - 1][col - 1] = item['values'][0][0]
+
+    def append_rows(self, rows):
+        self.call()
+        with self.lock:
+            self.values.extend([list(row) for row in rows])
+
+
+class FakeSpreadsheet:
+    def __init__(self, worksheets):
+        self.worksheets = worksheets
+
+    def worksheet(self, sheet_name):
+        return self.worksheets[sheet_name]
+
+
+class FakeSheetManager(ac.GoogleSheetManager):
+    """인증 대신 가짜 스프레드시트를 연결"""
+
+    def __init__(self, config, spreadsheet):
+        self.spreadsheet = spreadsheet
+        super().__init__(config)
+
+    def initialize_connection(self):
+        self.doc = self.spreadsheet
+        self.worksheets = {}
+
+
+# 배송중 주문마다 시트 행 하나, 그리고 주문 수의 5배만큼 배송완료 이력
+def make_spreadsheet(order_count, latency):
+    rows = [HEADER]
+    for idx in range(order_count * 5):
+        history = order_count + idx
+        rows.append([market_order_num(history), store_order_num(history), '', '', '', '', '', '',
+                     '2024-12-01\n(2024-12-01 12:00)', '배송완료', ''])
+    for idx in range(order_count):
+        rows.append([market_order_num(idx), store_order_num(idx), f"user{idx}\nuser{idx}@example.com\nid{idx}",
+                     str(idx % 50), f"https://example.com/p/{idx}", '100', '1000', f"service-{idx % 50}",
+                     '2025-01-01\n(2025-01-01 12:00)', '배송중', ''])
+    return FakeSpreadsheet({
+        'market_store_order_list': FakeWorksheet(rows, latency),
+        'manual_order_list': FakeWorksheet([MANUAL_HEADER], latency),
+    })
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def run_size(order_count, base_url, work_dir, sheet_latency, browser='fake'):
+    BenchHandler.order_count = order_count
+    name = f"bench-{order_count}"
+    config = ac.MallConfig(
+        name=name,
+        username='bench',
+        password='bench',
+        login_page=f"{base_url}/login",
+        dashboard_page=f"{base_url}/dashboard",
+        shipping_page=f"{base_url}/shipping",
+        store_api_key='bench',
+        store_basic_url=f"{base_url}/api",
+        make_hook_url=f"{base_url}/hook",
+        state_dir=os.path.join(work_dir, name),
+        chrome_data_dir=os.path.join(work_dir, f"chrome-{name}"),
+        debugging_port=free_port(),
+    )
+    spreadsheet = make_spreadsheet(order_count, sheet_latency)
+    ac._sheet_managers[name] = FakeSheetManager(config, spreadsheet)
+
+    # 지표 파일은 실제 logs/ (Prometheus 수집 위치) 대신 작업 디렉터리에 쓴다
+    patched = {'init_driver': ac.init_driver, 'metrics_dir': ac.metrics_dir}
+    ac.metrics_dir = os.path.join(work_dir, 'metrics')
+    if browser == 'fake':
+        ac.init_driver = lambda profile=None, config=None: FakeDriver(profile or ac.browser_profile)
+    try:
+        processed = asyncio.run(ac.main(config=config))
+    finally:
+        # 이 실행이 몰 이름으로 등록한 브라우저/시트/캐시/로컬 사본을 정리하고 바꾼 전역을 되돌린다
+        for registry in (ac._driver_managers, ac._status_caches, ac._order_stores):
+            resource = registry.pop(name, None)
+            if resource is not None:
+                resource.close()
+        ac._sheet_managers.pop(name, None)
+        for attr, value in patched.items():
+            setattr(ac, attr, value)
+
+    data = ac.metrics.snapshot(name, ac.last_cycle_stats.get('seconds', 0))
+    data['processed'] = len(processed)
+    data['sheet_calls'] = sum(ws.calls for ws in spreadsheet.worksheets.values())
+    return data
+
+
+def print_report(results):
+    sizes = [result['size'] for result in results]
+    stages = sorted({stage for result in results for stage in result['stage_seconds']})
+    width = max([len(stage) for stage in stages] + [12])
+    print()
+    print(f"{'stage':<{width}}" + ''.join(f"{size:>12}" for size in sizes))
+    for stage in stages:
+        print(f"{stage:<{width}}" + ''.join(f"{result['stage_seconds'].get(stage, 0):>11.2f}s" for result in results))
+    print(f"{'total':<{width}}" + ''.join(f"{result['total_seconds']:>11.2f}s" for result in results))
+    print(f"{'processed':<{width}}" + ''.join(f"{result['processed']:>12}" for result in results))
+    print(f"{'sheet calls':<{width}}" + ''.join(f"{result['sheet_calls']:>12}" for result in results))
+    print(f"{'api calls':<{width}}" + ''.join(f"{result['counters'].get('store_api_calls', 0):>12}" for result in results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='10,100,1000')
+    parser.add_argument('--api-latency', type=float, default=0.05, help='스토어 API 응답 지연 (초)')
+    parser.add_argument('--sheet-latency', type=float, default=0.2, help='시트 호출당 지연 (초)')
+    parser.add_argument('--browser', choices=('fake', 'chrome'), default='fake')
+    parser.add_argument('--page-latency', type=float, default=0.3, help='배송중 목록 페이지 응답 지연 (초)')
+    args = parser.parse_args()
+
+    BenchHandler.api_latency = args.api_latency
+    BenchHandler.page_latency = args.page_latency
+    server = ThreadingHTTPServer(('127.0.0.1', 0), BenchHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            for size in (int(size) for size in args.sizes.split(',')):
+                print(f"=== {size} orders ===")
+                result = run_size(size, base_url, work_dir, args.sheet_latency, args.browser)
+                result['size'] = size
+                results.append(result)
+    finally:
+        server.shutdown()
+    print_report(results)
+
+
+if __name__ == "__main__":
+    main()
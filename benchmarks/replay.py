@@ -0,0 +1,122 @@
+"""CYCLE_RECORD_DIR 로 저장한 사이클 캡처를 브라우저/네트워크 없이 다시 실행
+
+실행: python -m benchmarks.replay <capture.json.gz> [--repeat 5] [--profile] [--verbose]
+
+check_order, process_orders 의 행 계획, process_manual_order 의 중복 제외 계획을
+기록된 크롤링 결과, 시트 스냅샷, 스토어 응답으로 재실행하고 단계별 시간을 보여준다.
+"""
+import argparse
+import asyncio
+import copy
+import cProfile
+import logging
+import pstats
+import time
+
+import automation_check as ac
+
+
+class ReplayStoreAPI:
+    """기록된 {스토어주문번호: 응답} 으로 AsyncStoreAPI.get_order_status_map 을 대신"""
+
+    def __init__(self, status_map):
+        self.status_map = status_map
+        self.calls = 0
+
+    async def get_order_status_map(self, order_ids, chunk_size=None):
+        self.calls += 1
+        order_ids = dict.fromkeys(str(order_id) for order_id in order_ids)
+        return {order_id: self.status_map[order_id] for order_id in order_ids if order_id in self.status_map}
+
+
+def sheet_values(capture):
+    sheet = capture['sheet']
+    return [sheet['columns']] + sheet['rows']
+
+
+# 캡처 한 번을 재실행하고 단계별 소요 시간과 결과를 반환
+def replay(capture):
+    timings = {}
+    values = sheet_values(capture)
+
+    started = time.perf_counter()
+    order_index = ac.MarketOrderIndex(ac.build_sheet_frame(values))
+    timings['build_index'] = time.perf_counter() - started
+
+    orders = copy.deepcopy(capture['orders'])
+    store_api = ReplayStoreAPI(capture['status_map'])
+    stats = {}
+    started = time.perf_counter()
+    processed_orders, manual_orders = asyncio.run(ac.check_order(orders, order_index, store_api, stats=stats))
+    timings['check_order'] = time.perf_counter() - started
+
+    # 배송완료 처리가 없던 사이클은 시트 원본이 없으므로 스냅샷으로 계획
+    shipping_values = capture.get('shipping_values') or values
+    started = time.perf_counter()
+    _, order_plans, planned_rows = ac.plan_order_rows(shipping_values, processed_orders)
+    timings['plan_order_rows'] = time.perf_counter() - started
+
+    alerted = {tuple(key) for key in capture.get('alerted_manual_orders', [])}
+    started = time.perf_counter()
+    new_manual_orders = ac.plan_manual_orders(manual_orders, alerted)
+    timings['plan_manual_orders'] = time.perf_counter() - started
+
+    result = {
+        'scraped': len(orders),
+        'processed': len(processed_orders),
+        'manual': len(manual_orders),
+        'new_manual': len(new_manual_orders),
+        'pending': stats.get('pending', 0),
+        'planned_rows': len(planned_rows),
+        'unmatched': sum(1 for _, row_nums in order_plans if not row_nums),
+    }
+    return result, timings
+
+
+def print_report(capture, result, runs):
+    recorded = capture.get('stats', {})
+    print(f"캡처: {capture.get('mall')} ({len(capture['sheet']['rows'])}행, "
+          f"스토어 응답 {len(capture.get('store_responses', []))}건)")
+    print(f"{'':<16}{'기록':>10}{'재실행':>10}")
+    for key in ('scraped', 'processed', 'manual', 'pending'):
+        print(f"{key:<16}{str(recorded.get(key, '-')):>10}{result[key]:>10}")
+    for key in ('new_manual', 'planned_rows', 'unmatched'):
+        print(f"{key:<16}{'-':>10}{result[key]:>10}")
+
+    print()
+    print(f"{'stage':<20}{'min':>10}{'mean':>10}")
+    for stage in runs[0]:
+        seconds = [timings[stage] for timings in runs]
+        print(f"{stage:<20}{min(seconds) * 1000:>8.1f}ms{sum(seconds) / len(seconds) * 1000:>8.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('capture')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--profile', action='store_true', help='cProfile 누적 시간 상위 함수 출력')
+    parser.add_argument('--verbose', action='store_true', help='check_order 의 주문별 로그 표시')
+    args = parser.parse_args()
+
+    if args.verbose:
+        logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+
+    capture = ac.load_cycle_capture(args.capture)
+    profiler = cProfile.Profile() if args.profile else None
+    runs = []
+    for _ in range(max(args.repeat, 1)):
+        if profiler:
+            profiler.enable()
+        result, timings = replay(capture)
+        if profiler:
+            profiler.disable()
+        runs.append(timings)
+
+    print_report(capture, result, runs)
+    if profiler:
+        print()
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(25)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""market_store_order_list 로딩 방식별 시간/최대 메모리 비교
+
+실행: python -m benchmarks.sheet_loading [행 수 (기본 100000)]
+"""
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+from gspread.worksheet import Worksheet
+
+from automation_check import build_sheet_frame
+
+DEFAULT_ROW_COUNT = 100000
+
+HEADER = [
+    '마켓주문번호', '스토어주문번호', '주문자정보', '서비스ID', '링크',
+    '수량', '결제금액', '서비스명', '주문일시', '주문상태', '비고',
+]
+
+
+# 대부분 배송완료, 일부만 배송중인 합성 시트 데이터
+def make_values(row_count, shipping_ratio=0.02):
+    shipping_every = max(int(1 / shipping_ratio), 1)
+    values = [HEADER]
+    for i in range(row_count):
+        values.append([
+            f"20250101-{i:07d}",
+            str(100000 + i),
+            f"user{i}\nuser{i}@example.com\nid{i}",
+            str(i % 50),
+            f"https://example.com/p/{i}",
+            str(100 + i % 900),
+            str(1000 * (i % 30)),
+            f"service-{i % 50}",
+            f"2025-01-01\n(2025-01-01 12:{i % 60:02d})",
+            '배송중' if i % shipping_every == 0 else '배송완료',
+            '',
+        ])
+    return values
+
+
+class SnapshotWorksheet(Worksheet):
+    """API 호출 대신 values 를 돌려주는 gspread Worksheet, get_all_records 는 gspread 구현 그대로 사용"""
+
+    def __init__(self, values):
+        self.values = values
+
+    def get(self, *args, **kwargs):
+        return [list(row) for row in self.values]
+
+
+# 기존 방식: gspread get_all_records() (numericise 포함) 결과로 DataFrame 생성
+def load_records(values):
+    return pd.DataFrame(SnapshotWorksheet(values).get_all_records())
+
+
+# 시간은 추적 없이, 최대 메모리는 tracemalloc 으로 한 번 더 실행해 측정 (추적 비용이 시간에 섞이지 않도록)
+def measure(label, func, *args, **kwargs):
+    started = time.perf_counter()
+    df = func(*args, **kwargs)
+    elapsed = time.perf_counter() - started
+    del df
+    tracemalloc.start()
+    df = func(*args, **kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    frame_mb = df.memory_usage(deep=True).sum() / (1024 * 1024)
+    print(f"{label:<32} {elapsed:8.3f}s  peak {peak / (1024 * 1024):8.1f}MB  "
+          f"frame {frame_mb:8.1f}MB  rows {len(df)}")
+
+
+def main(row_count=DEFAULT_ROW_COUNT):
+    values = make_values(row_count)
+    print(f"합성 시트 {row_count}행")
+    measure('get_all_records + DataFrame', load_records, values)
+    measure('typed, all rows', build_sheet_frame, values)
+    measure('typed, 배송중 only', build_sheet_frame, values, only_shipping=True)
+    measure('typed, 3 columns, 배송중 only', build_sheet_frame, values,
+            columns=['마켓주문번호', '스토어주문번호', '주문상태'], only_shipping=True)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROW_COUNT)
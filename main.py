@@ -1,22 +1,46 @@
 import asyncio
+import json
 import logging
+import multiprocessing
+import queue
 import pytz
 import os
 
-from datetime import datetime, timezone, time
-from logging.handlers import TimedRotatingFileHandler
+from datetime import datetime, timedelta, timezone, time
+from logging.handlers import TimedRotatingFileHandler, QueueHandler, QueueListener
 from telegram import Bot
-from automation_check import main
+from automation_check import (
+    main, close_driver_managers, close_order_stores, close_mall_pool, last_cycle_stats,
+    malls_config, load_mall_configs, run_malls, format_mall_summary, mall_log_filter
+)
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# 적응형 실행 간격 설정 (초)
+SCHEDULER_INTERVAL = int(os.getenv("SCHEDULER_INTERVAL", "1800"))
+SCHEDULER_MIN_INTERVAL = int(os.getenv("SCHEDULER_MIN_INTERVAL", "600"))
+SCHEDULER_MAX_INTERVAL = int(os.getenv("SCHEDULER_MAX_INTERVAL", "3600"))
+# 완료되지 않은 스토어 주문이 이 수 이상이면 간격을 줄인다
+SCHEDULER_BUSY_PENDING = int(os.getenv("SCHEDULER_BUSY_PENDING", "20"))
+# KST 기준 조용한 시간대, 예: "1-7" (01시~07시), 비워두면 사용 안 함
+SCHEDULER_QUIET_HOURS = os.getenv("SCHEDULER_QUIET_HOURS", "")
+# 조용한 시간대에 한 번에 쉬는 최대 시간 (초)
+SCHEDULER_QUIET_MAX_SLEEP = int(os.getenv("SCHEDULER_QUIET_MAX_SLEEP", "43200"))
+# 콘솔 로그 형식: text | json (파일 로그는 항상 json)
+LOG_CONSOLE_FORMAT = os.getenv("LOG_CONSOLE_FORMAT", "text")
+
+KST = pytz.timezone('Asia/Seoul')
+# JSON 로그에 그대로 옮길 레코드 필드 (logger 호출의 extra)
+LOG_FIELDS = (
+    'mall', 'market_order_num', 'store_order_num', 'status', 'market_order_nums',
+    'orders', 'processed', 'manual', 'pending', 'rows_written', 'orders_written',
+)
+
 
 class KSTFormatter(logging.Formatter):
     def converter(self, timestamp):
-        dt = datetime.fromtimestamp(timestamp)
-        kst = pytz.timezone('Asia/Seoul')
-        return dt.replace(tzinfo=timezone.utc).astimezone(kst)
+        return datetime.fromtimestamp(timestamp, KST)
 
     def formatTime(self, record, datefmt=None):
         dt = self.converter(record.created)
@@ -24,9 +48,30 @@ class KSTFormatter(logging.Formatter):
             return dt.strftime(datefmt)
         return dt.strftime('%Y-%m-%d %H:%M:%S')
 
+class JsonFormatter(KSTFormatter):
+    """레코드 한 건을 JSON 한 줄로 (주문번호 등 extra 필드 포함)"""
+
+    def format(self, record):
+        data = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for field in LOG_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                data[field] = value
+        if record.exc_info:
+            data['exc'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+# 파일/콘솔 출력은 QueueListener 스레드가 맡고, 작업 경로에서는 큐에 넣기만 한다
+# 여러 몰을 프로세스 풀로 실행하면 작업자 로그도 같은 큐로 모이도록 multiprocessing Queue 를 사용
 def setup_logger(name):
     logger = logging.getLogger(name)
     logger.setLevel(logging.INFO)
+    logger.propagate = False
 
     log_dir = 'logs'
     if not os.path.exists(log_dir):
@@ -48,20 +93,25 @@ def setup_logger(name):
     kst_formatter = KSTFormatter(
         '%(asctime)s - %(levelname)s - %(message)s'
     )
-    file_handler.setFormatter(kst_formatter)
-    
-    # 콘솔 핸들러에도 동일한 KST 포매터 적용
+    json_formatter = JsonFormatter()
+    file_handler.setFormatter(json_formatter)
+
     console_handler = logging.StreamHandler()
-    console_handler.setFormatter(kst_formatter)
+    console_handler.setFormatter(json_formatter if LOG_CONSOLE_FORMAT == 'json' else kst_formatter)
+
+    log_queue = multiprocessing.get_context('spawn').Queue() if malls_config else queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(mall_log_filter)
+    logger.addHandler(queue_handler)
 
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    listener.start()
     
-    return logger
+    return logger, listener, log_queue
 
-logger = setup_logger('market_automation_check')
+logger, log_listener, log_queue = setup_logger('market_automation_check')
 
-async def send_telegram_alert(error_message):
+async def send_telegram_message(text):
     bot_token = os.getenv("TELEGRAM_BOT_TOKEN")
     chat_id = os.getenv("TELEGRAM_CHAT_ID")
     
@@ -69,35 +119,125 @@ async def send_telegram_alert(error_message):
         bot = Bot(token=bot_token)  # telegram.Bot이 아닌 Bot으로 사용
         await bot.send_message(
             chat_id=chat_id,
-            text=f"🚨 에러 발생!\n{error_message}"
+            text=text
         )
     except Exception as e:
         logger.error(f"Telegram 알림 전송 실패: {e}")
 
+async def send_telegram_alert(error_message):
+    await send_telegram_message(f"🚨 에러 발생!\n{error_message}")
+
+# main() 은 실패해도 예외 대신 빈 목록을 돌려주므로 last_cycle_stats 로 실패를 판단한다
+# 재시도는 체크포인트에서 끝난 단계(크롤링, 상태 확인, 시트 기록 등)를 건너뛰고 이어서 진행
 async def run_with_retry(max_retries=3):
     for attempt in range(max_retries):
         try:
-            return await main(logger=logger, send_alert=send_telegram_alert)
+            # 에러 알림은 마지막 시도가 실패했을 때만 보낸다
+            last_attempt = attempt == max_retries - 1
+            orders = await main(logger=logger, send_alert=send_telegram_alert if last_attempt else None,
+                                send_notice=send_telegram_message)
+            if not last_cycle_stats.get('failed'):
+                return orders
+            logger.error(f"Attempt {attempt + 1}/{max_retries} failed: {last_cycle_stats.get('error')}")
+            if last_attempt:
+                return orders
         except Exception as e:
             logger.error(f"Attempt {attempt + 1}/{max_retries} failed: {e}")
             logger.exception("상세 에러:")
-            if attempt < max_retries - 1:
-                await asyncio.sleep(60)
-            else:
+            if attempt == max_retries - 1:
                 raise
+        await asyncio.sleep(60)
+
+def in_quiet_hours(now):
+    if not SCHEDULER_QUIET_HOURS:
+        return False
+    start, end = (int(hour) for hour in SCHEDULER_QUIET_HOURS.split('-'))
+    if start <= end:
+        return start <= now.hour < end
+    return now.hour >= start or now.hour < end
+
+# moment 가 속한 조용한 시간대가 끝나는 시각
+def quiet_end(moment):
+    end = int(SCHEDULER_QUIET_HOURS.split('-')[1])
+    end_time = moment.replace(hour=end, minute=0, second=0, microsecond=0)
+    if end_time <= moment:
+        end_time += timedelta(days=1)
+    return end_time
+
+# 조용한 시간대에는 시간대가 끝날 때까지 (최대 SCHEDULER_QUIET_MAX_SLEEP) 쉰다
+def quiet_interval(now, moment):
+    end_time = quiet_end(moment)
+    interval = min(int((end_time - now).total_seconds()), SCHEDULER_QUIET_MAX_SLEEP)
+    return interval, f"quiet hours until {end_time:%H:%M}"
+
+# 마지막 사이클 결과로 다음 실행까지의 간격과 이유를 결정
+def next_interval(stats, now):
+    if in_quiet_hours(now):
+        return quiet_interval(now, now)
+    if stats.get('failed'):
+        interval, reason = SCHEDULER_INTERVAL, "last cycle failed"
+    elif stats.get('failed_writes'):
+        interval, reason = SCHEDULER_MIN_INTERVAL, f"{stats['failed_writes']} failed sheet writes"
+    elif stats.get('pending', 0) >= SCHEDULER_BUSY_PENDING:
+        interval, reason = SCHEDULER_MIN_INTERVAL, f"{stats['pending']} store orders in progress"
+    elif not stats.get('scraped'):
+        interval, reason = SCHEDULER_MAX_INTERVAL, "empty backlog"
+    elif stats.get('pending'):
+        # 진행 중 주문 수에 비례해 기본 간격에서 최소 간격 쪽으로 줄인다
+        ratio = stats['pending'] / SCHEDULER_BUSY_PENDING
+        interval = int(SCHEDULER_INTERVAL - (SCHEDULER_INTERVAL - SCHEDULER_MIN_INTERVAL) * ratio)
+        reason = f"{stats['pending']} store orders in progress"
+    else:
+        interval, reason = SCHEDULER_INTERVAL, "default"
+    interval = max(SCHEDULER_MIN_INTERVAL, min(SCHEDULER_MAX_INTERVAL, interval))
+    # 다음 실행이 조용한 시간대에 걸리면 시간대가 끝난 뒤로 미룬다
+    wake = now + timedelta(seconds=interval)
+    if in_quiet_hours(wake):
+        return quiet_interval(now, wake)
+    return interval, reason
+
+# 여러 몰을 동시에 실행하고 결과를 알림 한 번으로 보낸다
+async def run_all_malls():
+    results = await run_malls(load_mall_configs(), log_queue=log_queue)
+    for result in results:
+        logger.info(f"[{result['mall']}] {result}")
+    await send_telegram_message(format_mall_summary(results))
+    return results
+
+# 몰별 결과를 합쳐 스케줄러 간격 계산에 사용
+def merge_mall_stats(results):
+    return {
+        'failed': all(result.get('failed') for result in results),
+        'scraped': sum(result.get('scraped', 0) for result in results),
+        'pending': sum(result.get('pending', 0) for result in results),
+        'failed_writes': sum(result.get('failed_writes', 0) for result in results),
+    }
 
 async def scheduler():
     kst = pytz.timezone('Asia/Seoul')
     while True:
         try:
             start_time = datetime.now(timezone.utc).astimezone(kst)
+            # 조용한 시간대에 시작된 경우(서비스 재시작 등) 실행하지 않고 시간대가 끝날 때까지 대기
+            if in_quiet_hours(start_time):
+                interval, reason = next_interval({}, start_time)
+                logger.info(f"Skipping execution at {start_time} ({reason}), next check in {interval}s")
+                await asyncio.sleep(interval)
+                continue
             logger.info(f"Starting execution at {start_time}")
             
-            orders = await run_with_retry()
-            logger.info(f"Processed orders: {orders}")
+            if malls_config:
+                cycle_stats = merge_mall_stats(await run_all_malls())
+            else:
+                orders = await run_with_retry()
+                logger.info(f"Processed orders: {orders}")
+                cycle_stats = dict(last_cycle_stats)
             
-            logger.info(f"Completed execution at {datetime.now(timezone.utc).astimezone(kst)}")
-            await asyncio.sleep(1800)
+            completed_time = datetime.now(timezone.utc).astimezone(kst)
+            logger.info(f"Completed execution at {completed_time}")
+            interval, reason = next_interval(cycle_stats, completed_time)
+            logger.info(f"Next execution in {interval}s ({reason}), cycle stats: {cycle_stats}")
+            await asyncio.sleep(interval)
             
         except Exception as e:
             error_msg = f"Automation Check critical error occurred: {e}"
@@ -118,4 +258,8 @@ if __name__ == "__main__":
         logger.exception("상세 에러:")
     finally:
         logger.info("서비스 종료")
-        loop.close()
\ No newline at end of file
+        close_mall_pool()
+        close_driver_managers()
+        close_order_stores()
+        loop.close()
+        log_listener.stop()
\ No newline at end of file
@@ -0,0 +1,51 @@
+import threading
+
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import automation_check as ac
+from benchmarks import cycle
+
+
+class RecordingDriver(cycle.FakeDriver):
+    def __init__(self, browser_profile):
+        super().__init__(browser_profile)
+        self.blocked = []
+
+    def execute_cdp_cmd(self, cmd, params):
+        if cmd == 'Network.setBlockedURLs':
+            self.blocked.append((self.current_window_handle, self.current_url))
+        return super().execute_cdp_cmd(cmd, params)
+
+
+@pytest.fixture
+def base_url(monkeypatch):
+    monkeypatch.setattr(cycle.BenchHandler, 'order_count', 3)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), cycle.BenchHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def scrape(driver, base_url):
+    urls = [f"{base_url}/shipping?page=1", f"{base_url}/shipping?page=2"]
+    return ac.scrape_tabs(driver, urls, ac.WebDriverWait(driver, timeout=5))
+
+
+def test_lean_blocking_is_applied_to_each_tab_before_it_loads(base_url):
+    driver = RecordingDriver('lean')
+
+    results = scrape(driver, base_url)
+
+    assert [handle for handle, _ in driver.blocked] == ['tab-1', 'tab-2']
+    assert all(url == 'about:blank' for _, url in driver.blocked)
+    assert all(rows is not None for rows in results)
+
+
+def test_normal_profile_does_not_block(base_url):
+    driver = RecordingDriver('normal')
+
+    scrape(driver, base_url)
+
+    assert driver.blocked == []
@@ -0,0 +1,104 @@
+import asyncio
+import os
+import threading
+
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import automation_check as ac
+from benchmarks import cycle
+
+ORDER_COUNT = 20
+
+
+@pytest.fixture
+def bench(tmp_path, monkeypatch):
+    monkeypatch.setattr(cycle.BenchHandler, 'order_count', ORDER_COUNT)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), cycle.BenchHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    config = ac.MallConfig(
+        name='journal-test', username='bench', password='bench',
+        login_page=f"{base_url}/login", dashboard_page=f"{base_url}/dashboard",
+        shipping_page=f"{base_url}/shipping", store_api_key='bench',
+        store_basic_url=f"{base_url}/api", make_hook_url=f"{base_url}/hook",
+        state_dir=str(tmp_path / 'state'),
+    )
+    spreadsheet = cycle.make_spreadsheet(ORDER_COUNT, 0)
+    monkeypatch.setattr(ac, 'order_store_enabled', False)
+    monkeypatch.setattr(ac, 'metrics_dir', str(tmp_path / 'metrics'))
+    monkeypatch.setattr(ac, 'init_driver', lambda profile=None, config=None: cycle.FakeDriver())
+    monkeypatch.setitem(ac._sheet_managers, config.name, cycle.FakeSheetManager(config, spreadsheet))
+    yield config, spreadsheet
+    ac.close_driver_managers()
+    ac._driver_managers.pop(config.name, None)
+    ac._status_caches.pop(config.name).close()
+    server.shutdown()
+
+
+def count_calls(monkeypatch, name, fail_first=False):
+    calls = []
+    original = getattr(ac, name)
+
+    def counted(*args, **kwargs):
+        calls.append(args)
+        if fail_first and len(calls) == 1:
+            raise RuntimeError(f"{name} failed")
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(ac, name, counted)
+    return calls
+
+
+def test_failed_eship_resumes_without_rescraping_or_rewriting(bench, monkeypatch):
+    config, spreadsheet = bench
+    scrapes = count_calls(monkeypatch, 'scrape_orders')
+    writes = count_calls(monkeypatch, 'process_orders')
+    eships = count_calls(monkeypatch, 'process_eship', fail_first=True)
+    journal_path = os.path.join(config.state_dir, ac.CYCLE_JOURNAL_FILE)
+
+    asyncio.run(ac.main(config=config))
+    assert ac.last_cycle_stats['failed']
+    assert os.path.exists(journal_path)
+    written = [row for row in spreadsheet.worksheets['market_store_order_list'].values if row[9] == '배송완료']
+
+    processed = asyncio.run(ac.main(config=config))
+
+    assert not ac.last_cycle_stats['failed']
+    assert (len(scrapes), len(writes), len(eships)) == (1, 1, 2)
+    # 재시도는 체크포인트의 시트 기록 결과로 같은 주문을 Cafe24 에서 처리
+    assert eships[1][1][1] == eships[0][1][1]
+    assert all(isinstance(order['page_key'], tuple) for order in eships[1][1][1] if order.get('page_key'))
+    assert [row for row in spreadsheet.worksheets['market_store_order_list'].values if row[9] == '배송완료'] == written
+    assert len(processed) == len(eships[1][1][1])
+    assert not os.path.exists(journal_path)
+
+
+def test_stale_journal_is_discarded(tmp_path):
+    journal = ac.CycleJournal(str(tmp_path), ttl=60)
+    journal.commit('scraped', [{'market_order_num': '1', 'page_key': [0, 1]}])
+
+    resumed = ac.CycleJournal(str(tmp_path), ttl=60).load()
+    assert resumed.get('scraped')[0]['page_key'] == (0, 1)
+
+    expired = ac.CycleJournal(str(tmp_path), ttl=-1).load()
+    assert not expired.done('scraped')
+    assert not os.path.exists(journal.path)
+
+
+def test_run_mall_retries_failed_cycle(monkeypatch):
+    attempts = []
+
+    async def fake_main(config=None):
+        attempts.append(config.name)
+        ac.last_cycle_stats.clear()
+        ac.last_cycle_stats.update({'mall': config.name, 'failed': len(attempts) == 1})
+
+    monkeypatch.setattr(ac, 'main', fake_main)
+    monkeypatch.setattr(ac, 'mall_retry_delay', 0)
+
+    result = ac.run_mall(ac.MallConfig(name='retry-test'))
+
+    assert attempts == ['retry-test', 'retry-test']
+    assert not result['failed']
@@ -0,0 +1,96 @@
+import pytest
+
+import automation_check as ac
+from benchmarks import cycle
+
+SHEET = 'market_store_order_list'
+STATUS_COL = cycle.HEADER.index('주문상태') + 1
+
+
+@pytest.fixture
+def store(tmp_path):
+    config = ac.MallConfig(name='test', store_api_key='k', store_basic_url='http://127.0.0.1/api',
+                           make_hook_url='http://127.0.0.1/hook', state_dir=str(tmp_path))
+    spreadsheet = cycle.make_spreadsheet(3, 0)
+    order_store = ac.LocalOrderStore(cycle.FakeSheetManager(config, spreadsheet))
+    order_store.pull(SHEET)
+    yield order_store
+    order_store.close()
+
+
+def worksheet(store):
+    return store.sheet_manager.spreadsheet.worksheets[SHEET]
+
+
+def shipping_row(store, idx):
+    values = worksheet(store).values
+    return next(row_num for row_num, row in enumerate(values, start=1) if row[0] == cycle.market_order_num(idx))
+
+
+def orders(*indexes):
+    return [{'market_order_num': cycle.market_order_num(idx)} for idx in indexes]
+
+
+def test_process_orders_local_writes_and_confirms(store):
+    success, written = ac.process_orders_local(store, orders(0, 1))
+
+    assert success
+    assert [order['market_order_num'] for order in written] == [cycle.market_order_num(0), cycle.market_order_num(1)]
+    values = worksheet(store).values
+    assert values[shipping_row(store, 0) - 1][STATUS_COL - 1] == '배송완료'
+    assert values[shipping_row(store, 2) - 1][STATUS_COL - 1] == '배송중'
+    assert store.connect().execute("SELECT COUNT(*) FROM pending_updates").fetchone()[0] == 0
+
+
+def test_push_reapplies_change_after_row_inserted_above(store):
+    row_num = shipping_row(store, 1)
+    store.update_cells(SHEET, [(row_num, STATUS_COL, '배송완료')])
+    worksheet(store).values.insert(1, ['new-market', 'new-store'] + [''] * (len(cycle.HEADER) - 2))
+
+    confirmed = store.push_updates(SHEET)
+
+    values = worksheet(store).values
+    assert values[row_num][STATUS_COL - 1] == '배송완료'
+    # 원래 행 번호로 밀려 내려온 다른 주문은 그대로
+    assert values[row_num - 1][0] == cycle.market_order_num(0)
+    assert values[row_num - 1][STATUS_COL - 1] == '배송중'
+    assert (cycle.market_order_num(1), cycle.store_order_num(1), STATUS_COL, '배송완료') in confirmed
+    assert store.connect().execute("SELECT COUNT(*) FROM pending_updates").fetchone()[0] == 0
+
+
+def test_pull_rekeys_pending_change_after_row_inserted_above(store):
+    row_num = shipping_row(store, 1)
+    store.update_cells(SHEET, [(row_num, STATUS_COL, '배송완료')])
+    worksheet(store).values.insert(1, ['new-market', 'new-store'] + [''] * (len(cycle.HEADER) - 2))
+
+    store.pull(SHEET)
+
+    assert store.connect().execute("SELECT row_num FROM pending_updates").fetchall() == [(row_num + 1,)]
+    store.push_updates(SHEET)
+    assert worksheet(store).values[row_num][STATUS_COL - 1] == '배송완료'
+
+
+def test_external_edit_is_a_conflict(store):
+    row_num = shipping_row(store, 0)
+    store.update_cells(SHEET, [(row_num, STATUS_COL, '배송완료')])
+    worksheet(store).values[row_num - 1][STATUS_COL - 1] = '취소'
+
+    confirmed = store.push_updates(SHEET)
+
+    assert confirmed == set()
+    assert worksheet(store).values[row_num - 1][STATUS_COL - 1] == '취소'
+    assert store.frame(SHEET).set_index('마켓주문번호').loc[cycle.market_order_num(0), '주문상태'] == '취소'
+
+
+def test_failed_push_does_not_report_orders_written(store, monkeypatch):
+    def fail(*args, **kwargs):
+        raise ConnectionError('sheet down')
+
+    monkeypatch.setattr(worksheet(store), 'batch_update', fail)
+
+    success, written = ac.process_orders_local(store, orders(0))
+
+    assert not success
+    assert written == []
+    # 기록은 대기열에 남아 다음 동기화에서 반영
+    assert store.connect().execute("SELECT COUNT(*) FROM pending_updates").fetchone()[0] == 1
@@ -0,0 +1,63 @@
+import pytest
+
+import automation_check as ac
+from benchmarks import cycle
+
+
+class Response:
+    def __init__(self, ok):
+        self.ok = ok
+        self.status_code = 200 if ok else 500
+        self.text = ''
+
+
+def manual_order(idx, status='취소요청'):
+    return [cycle.market_order_num(idx), cycle.store_order_num(idx), f"user{idx}\nuser{idx}@example.com\nid{idx}",
+            '1', 'https://example.com/p', '100', '1000', 'service', '2025-01-01\n(2025-01-01 12:00)', status]
+
+
+@pytest.fixture
+def sheet_manager(tmp_path, monkeypatch):
+    monkeypatch.setattr(ac, 'order_store_enabled', False)
+    config = ac.MallConfig(name='test', store_api_key='k', store_basic_url='http://127.0.0.1/api',
+                           make_hook_url='http://127.0.0.1/hook', state_dir=str(tmp_path))
+    return cycle.FakeSheetManager(config, cycle.make_spreadsheet(1, 0))
+
+
+def run(sheet_manager, orders):
+    worksheet = sheet_manager.get_worksheet('manual_order_list')
+    ac.process_manual_order(worksheet, orders, 'http://127.0.0.1/hook', sheet_manager)
+    return worksheet.values[1:]
+
+
+def test_plan_manual_orders_skips_alerted_and_duplicates():
+    orders = [manual_order(0), manual_order(0), manual_order(1), manual_order(1, '반품요청')]
+    alerted = {ac.manual_order_key(manual_order(1))}
+
+    new_orders = ac.plan_manual_orders(orders, alerted)
+
+    assert [ac.manual_order_key(order) for order in new_orders] == [
+        ac.manual_order_key(manual_order(0)), ac.manual_order_key(manual_order(1, '반품요청'))
+    ]
+
+
+def test_failed_alert_is_retried_without_appending_again(sheet_manager, monkeypatch):
+    responses = iter([Response(False), Response(True)])
+    posted = []
+
+    def post(url, json):
+        posted.append(json['order_num'])
+        return next(responses)
+
+    monkeypatch.setattr(ac.requests, 'post', post)
+
+    rows = run(sheet_manager, [manual_order(0)])
+    assert len(rows) == 1
+
+    rows = run(sheet_manager, [manual_order(0)])
+    assert len(rows) == 1
+    assert posted == [cycle.market_order_num(0)] * 2
+
+    rows = run(sheet_manager, [manual_order(0)])
+    assert len(rows) == 1
+    assert len(posted) == 2
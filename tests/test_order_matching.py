@@ -0,0 +1,125 @@
+import asyncio
+
+import pandas as pd
+
+import automation_check as ac
+from benchmarks.sheet_loading import SnapshotWorksheet
+
+HEADER = ['마켓주문번호', '스토어주문번호', '주문자정보', '서비스ID', '링크',
+          '수량', '결제금액', '서비스명', '주문일시', '주문상태', '비고']
+
+
+def sheet_row(market_order_num, store_order_num, status='배송중'):
+    return [market_order_num, store_order_num, '', '', '', '', '', '', '', status, '']
+
+
+class FakeStoreAPI:
+    def __init__(self, statuses):
+        self.statuses = statuses
+
+    async def get_order_status_map(self, order_ids, chunk_size=None):
+        return {str(order_id): {'status': self.statuses[str(order_id)]} for order_id in order_ids}
+
+
+def scraped(market_order_num):
+    return {'market_order_num': market_order_num, 'cafe24_order_num': market_order_num}
+
+
+def run_check(values, orders, statuses):
+    index = ac.MarketOrderIndex(ac.build_sheet_frame(values))
+    return asyncio.run(ac.check_order(orders, index, FakeStoreAPI(statuses)))
+
+
+def test_index_matches_tokens_before_substrings():
+    values = [HEADER, sheet_row('M-1', '1'), sheet_row('M-12', '12'), sheet_row('M-3, M-4', '34')]
+    index = ac.MarketOrderIndex(ac.build_sheet_frame(values))
+
+    assert index.find_shipping_positions('M-1') == [0]
+    assert index.find_shipping_positions('M-4') == [2]
+    # 토큰이 없으면 기존처럼 부분일치
+    assert index.find_shipping_positions('M-') == [0, 1, 2]
+
+
+def test_index_ignores_rows_not_in_shipping():
+    values = [HEADER, sheet_row('M-1', '1', '배송완료'), sheet_row('M-1', '2')]
+    index = ac.MarketOrderIndex(ac.build_sheet_frame(values))
+
+    assert index.find_shipping_positions('M-1') == [1]
+
+
+def test_plan_writes_only_rows_that_decided_status():
+    values = [HEADER, sheet_row('M-1', '1'), sheet_row('M-12', '12')]
+    orders = [scraped('M-1'), scraped('M-12')]
+    processed, _ = run_check(values, orders, {'1': 'Completed', '12': 'In progress'})
+
+    assert [order['cafe24_order_num'] for order in processed] == ['M-1']
+    _, order_plans, planned_rows = ac.plan_order_rows(values, processed)
+    assert planned_rows == {2}
+    assert order_plans[0][1] == [2]
+
+
+def test_plan_follows_rows_that_moved_since_check():
+    values = [HEADER, sheet_row('M-1', '1'), sheet_row('M-2', '2')]
+    processed, _ = run_check(values, [scraped('M-2')], {'2': 'Completed'})
+
+    # 시트를 다시 읽었을 때 위에 행이 추가되어 있어도 같은 주문 행을 찾는다
+    moved = [HEADER, sheet_row('M-0', '0'), sheet_row('M-1', '1'), sheet_row('M-2', '2')]
+    _, _, planned_rows = ac.plan_order_rows(moved, processed)
+    assert planned_rows == {4}
+
+
+def test_plan_skips_rows_added_after_check():
+    values = [HEADER, sheet_row('M-5', '5')]
+    processed, _ = run_check(values, [scraped('M-5')], {'5': 'Completed'})
+
+    # 상태 확인 이후 같은 주문번호로 추가된 행은 확인하지 않았으므로 건드리지 않는다
+    grown = values + [sheet_row('M-5', '6')]
+    _, _, planned_rows = ac.plan_order_rows(grown, processed)
+    assert planned_rows == {2}
+
+
+def test_plan_respects_sheet_row_numbers():
+    values = [HEADER, sheet_row('M-7', '7')]
+    processed, _ = run_check(values, [scraped('M-7')], {'7': 'Completed'})
+
+    _, _, planned_rows = ac.plan_order_rows(values, processed, sheet_row_nums=[40])
+    assert planned_rows == {40}
+
+
+def test_plan_matches_numericised_check_frame():
+    values = [HEADER, sheet_row('M-1', ' 00123')]
+    # 기본 경로의 check_order 는 get_all_records(numericise) 로 만든 DataFrame 을 사용
+    records = SnapshotWorksheet(values).get_all_records()
+    index = ac.MarketOrderIndex(pd.DataFrame(records))
+    processed, _ = asyncio.run(ac.check_order([scraped('M-1')], index, FakeStoreAPI({'123': 'Completed'})))
+
+    _, order_plans, planned_rows = ac.plan_order_rows(values, processed)
+    assert planned_rows == {2}
+    assert order_plans[0][1] == [2]
+
+
+class RecordingWorksheet:
+    def __init__(self, values):
+        self.values = values
+        self.updates = []
+
+    def get_all_values(self):
+        return [list(row) for row in self.values]
+
+    def batch_update(self, data):
+        self.updates.extend(item['range'] for item in data)
+
+
+def test_orders_without_planned_rows_are_not_reported_written():
+    values = [HEADER, sheet_row('M-1', '1')]
+    orders = [scraped('M-1'), scraped('M-9')]
+    for order in orders:
+        order['status_rows'] = []
+    orders[0]['status_rows'] = [['M-1', '1']]
+    worksheet = RecordingWorksheet(values)
+
+    written, written_orders = ac.process_orders(worksheet, orders)
+
+    assert written
+    assert worksheet.updates == ['J2']
+    assert [order['market_order_num'] for order in written_orders] == ['M-1']
@@ -0,0 +1,55 @@
+import automation_check as ac
+
+
+def page_rows(order_nums):
+    return [{'order_num_text': f"2025-01-01 12:00\n{num} 상세", 'has_checkbox': True, 'cells': []} for num in order_nums]
+
+
+class FakeAdmin:
+    """scrape_tabs 대신 URL 의 page 파라미터로 주문 행을 돌려준다"""
+
+    def __init__(self, order_count, page_size, honour_page=True):
+        self.order_nums = [f"M-{idx}" for idx in range(order_count)]
+        self.page_size = page_size
+        self.honour_page = honour_page
+        self.loads = 0
+
+    def scrape_tabs(self, driver, urls, wait):
+        results = []
+        for url in urls:
+            self.loads += 1
+            page = int(ac.parse_qs(ac.urlparse(url).query)[ac.shipping_page_param][0]) if self.honour_page else 1
+            results.append(page_rows(self.order_nums[(page - 1) * self.page_size:page * self.page_size]))
+        return results
+
+
+def scrape(monkeypatch, admin, max_pages=50):
+    monkeypatch.setattr(ac, 'scrape_mode', 'paged')
+    monkeypatch.setattr(ac, 'scrape_max_pages', max_pages)
+    monkeypatch.setattr(ac, 'scrape_tabs', admin.scrape_tabs)
+    orders, _ = ac.scrape_all_orders(None, 'http://admin.test/shipping', None)
+    return [order['market_order_num'] for order in orders]
+
+
+def test_reads_every_page_when_admin_caps_page_size(monkeypatch):
+    # SHIPPING_PAGE_SIZE(500)보다 작은 100행 단위로 잘라 주는 화면
+    admin = FakeAdmin(order_count=250, page_size=100)
+    assert scrape(monkeypatch, admin) == admin.order_nums
+
+
+def test_stops_when_admin_ignores_page_param(monkeypatch):
+    admin = FakeAdmin(order_count=600, page_size=500, honour_page=False)
+    assert scrape(monkeypatch, admin) == admin.order_nums[:500]
+    assert admin.loads == 2
+
+
+def test_stops_on_empty_page(monkeypatch):
+    admin = FakeAdmin(order_count=500, page_size=500)
+    assert scrape(monkeypatch, admin) == admin.order_nums
+    assert admin.loads == 2
+
+
+def test_hard_page_cap(monkeypatch):
+    admin = FakeAdmin(order_count=1000, page_size=10)
+    assert len(scrape(monkeypatch, admin, max_pages=3)) == 30
+    assert admin.loads == 3
@@ -0,0 +1,82 @@
+import json
+
+import pytest
+import requests
+
+from gspread.exceptions import APIError
+
+import automation_check as ac
+from benchmarks import cycle
+
+SHEET = 'market_store_order_list'
+
+
+def api_error(status_code, message):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps({'error': {'code': status_code, 'message': message}}).encode()
+    return APIError(response)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    config = ac.MallConfig(name='test', store_api_key='k', store_basic_url='http://127.0.0.1/api',
+                           make_hook_url='http://127.0.0.1/hook', state_dir=str(tmp_path))
+    sheet_manager = cycle.FakeSheetManager(config, cycle.make_spreadsheet(2, 0))
+    sheet_manager.data_ttl = 0
+    return sheet_manager
+
+
+def worksheet(manager):
+    return manager.spreadsheet.worksheets[SHEET]
+
+
+def test_new_rows_are_read_within_grid(manager, monkeypatch):
+    manager.get_sheet_data_incremental(SHEET)
+    worksheet(manager).values.append(['M-new', 'S-new'] + [''] * 7 + ['배송중', ''])
+    requested = []
+    batch_get = worksheet(manager).batch_get
+
+    def recording_batch_get(ranges):
+        requested.extend(ranges)
+        return batch_get(ranges)
+
+    monkeypatch.setattr(worksheet(manager), 'batch_get', recording_batch_get)
+
+    df = manager.get_sheet_data_incremental(SHEET)
+
+    row_count = len(worksheet(manager).values)
+    assert f"A{row_count}:K{row_count}" in requested
+    assert all(not range_.endswith(':K') for range_ in requested)
+    assert df['마켓주문번호'].iloc[-1] == 'M-new'
+
+
+def test_range_error_falls_back_to_full_reload(manager, monkeypatch):
+    manager.get_sheet_data_incremental(SHEET)
+
+    def fail(ranges):
+        raise api_error(400, 'Range exceeds grid limits')
+
+    monkeypatch.setattr(worksheet(manager), 'batch_get', fail)
+
+    df = manager.get_sheet_data_incremental(SHEET)
+
+    assert len(df) == len(worksheet(manager).values) - 1
+
+
+@pytest.mark.parametrize('status_code, calls', [(400, 1), (403, 1), (429, 1), (503, 2)])
+def test_write_cells_retries_only_server_errors(monkeypatch, status_code, calls):
+    monkeypatch.setattr(ac.time, 'sleep', lambda seconds: None)
+    attempts = []
+
+    class FailingWorksheet:
+        def batch_update(self, data):
+            attempts.append(data)
+            if len(attempts) == 1:
+                raise api_error(status_code, 'error')
+
+    try:
+        ac.write_cells(FailingWorksheet(), [(2, 10, '배송완료')])
+    except APIError:
+        pass
+    assert len(attempts) == calls
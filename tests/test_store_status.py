@@ -0,0 +1,28 @@
+import automation_check as ac
+
+
+class StubStoreAPI(ac.StoreAPI):
+    def __init__(self, cache, multi, single):
+        super().__init__('k', cache=cache, base_url='http://127.0.0.1/api')
+        self.multi = multi
+        self.single = single
+
+    def get_multiple_order_status(self, order_ids):
+        return self.multi
+
+    def get_order_status(self, order_id):
+        return self.single[order_id]
+
+
+def test_single_status_error_payloads_are_not_cached(tmp_path):
+    cache = ac.StatusCache(path=str(tmp_path / 'status.sqlite3'))
+    api = StubStoreAPI(
+        cache,
+        multi={'1': {'status': 'Completed'}, '2': {'error': 'Incorrect order ID'}, '3': {'error': 'Incorrect order ID'}},
+        single={'2': {'error': 'Incorrect order ID'}, '3': {'status': 'In progress'}},
+    )
+
+    status_map = api.get_order_status_map(['1', '2', '3'])
+
+    assert status_map == {'1': {'status': 'Completed'}, '3': {'status': 'In progress'}}
+    assert set(cache.get_many(['1', '2', '3'])) == {'1', '3'}